@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
@@ -47,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -90,6 +93,68 @@ DATABASES = {
     }
 }
 
+# With DB_POOL set, connections are checked out of a per-process pool
+# and returned to it at the end of each request instead of being closed.
+
+if os.environ.get('DB_POOL'):
+    DATABASES['default'].update({
+        'ENGINE': 'core.db.backends.postgresql_pool',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 20)),
+            'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'CHECK_IDLE': 30,
+        },
+    })
+
+# Reads opted into by ReplicaReadMixin go to one of DATABASE_REPLICAS,
+# which is only populated when DB_REPLICA_HOST is set. In tests the replica
+# alias mirrors the default test database.
+
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'HOST': os.environ.get('DB_REPLICA_HOST', os.environ.get('DB_HOST')),
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_REPLICAS = ['replica'] if os.environ.get('DB_REPLICA_HOST') else []
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# After a write, the user's reads stay on the primary for
+# REPLICA_STICKY_SECONDS. The pin is stored in the REPLICA_STICKY_CACHE
+# alias of CACHES, which must be shared between processes.
+
+REPLICA_STICKY_SECONDS = 5
+
+REPLICA_STICKY_CACHE = 'default'
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Version tokens, stampede locks, replica pins and the trending and popular
+# lists are shared between web and worker processes through the default
+# cache, so deployments must set REDIS_URL. The in-process LocMemCache is
+# only correct for tests and a single runserver process.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+
+PROFILE_CACHE_TIMEOUT = 3600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -141,10 +206,108 @@ AUTH_USER_MODEL = 'core.User'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
-}
\ No newline at end of file
+}
+
+# Home timeline
+# Tweets by accounts with fewer followers than the threshold are pushed into
+# each follower's timeline on write; the rest are pulled and merged on read.
+
+TIMELINE_FANOUT_THRESHOLD = int(os.environ.get('TIMELINE_FANOUT_THRESHOLD', 10000))
+TIMELINE_FANOUT_BATCH_SIZE = 1000
+TIMELINE_BACKFILL_SIZE = 50
+
+
+# Token authentication cache
+# LOCAL_* configure the in-process LRU; SHARED_ALIAS names an entry in CACHES
+# shared between processes, or None to use the in-process tier only.
+
+TOKEN_AUTH_CACHE = {
+    'LOCAL_MAX_SIZE': 10000,
+    'LOCAL_TTL': 30,
+    'SHARED_ALIAS': os.environ.get('TOKEN_AUTH_CACHE_ALIAS'),
+    'SHARED_TTL': 300,
+}
+
+
+# Bulk writes
+
+BULK_LIKE_MAX_IDS = 100
+BULK_FOLLOW_MAX_TARGETS = 5000
+
+
+# Profile images
+# Uploads are stored as sent and resized by a job on the 'images' queue into
+# square renditions of every size and format.
+
+PROFILE_IMAGE_SIZES = (48, 96, 400)
+PROFILE_IMAGE_FORMATS = ('webp', 'jpeg')
+PROFILE_IMAGE_QUALITY = 85
+
+
+# Tweet search
+# Matches are ranked among the newest TWEET_SEARCH_CANDIDATES, so the cost of
+# a search stays bounded however common its terms are. The config must match
+# the one used by the core_tweet search_vector trigger.
+
+TWEET_SEARCH_CONFIG = 'english'
+TWEET_SEARCH_CANDIDATES = 1000
+
+
+# Trending hashtags
+# Hashtag uses are counted per TRENDING_BUCKET_SECONDS bucket; each window
+# sums the buckets it covers. Run prune_trending to drop expired buckets.
+
+TRENDING_BUCKET_SECONDS = 300
+TRENDING_WINDOWS = {'1h': 3600, '24h': 86400}
+TRENDING_MAX_RESULTS = 50
+TRENDING_CACHE_TIMEOUT = 30
+
+
+# Popular tweets
+# Likes decay with a half-life, so tweets are ranked by a score that only
+# changes when they are liked or unliked. Tweets older than
+# POPULAR_MAX_AGE_HOURS leave the candidate set; refresh_popular_tweets
+# prunes them and caches the top POPULAR_TOP_K.
+
+POPULAR_HALF_LIFE_HOURS = 12
+POPULAR_MAX_AGE_HOURS = 72
+POPULAR_TOP_K = 100
+POPULAR_CACHE_TIMEOUT = 300
+
+
+# Streaming lists
+# List endpoints called with ?stream=true read rows through a server-side
+# cursor and send them as one JSON array, STREAM_CHUNK_SIZE rows at a time.
+
+STREAM_CHUNK_SIZE = 500
+
+
+# Background jobs
+# QUEUES maps each queue to the most jobs it may run at once across all
+# workers, or None for no limit. Failed jobs are retried after
+# BACKOFF_BASE * 2 ** (attempt - 1) seconds, up to BACKOFF_MAX. Workers
+# refresh a running job every HEARTBEAT_INTERVAL seconds; jobs without a
+# heartbeat for LOCK_TIMEOUT seconds are assumed lost and requeued.
+
+JOBS = {
+    'QUEUES': {'default': None, 'fanout': 4, 'images': 2},
+    'THREADS': int(os.environ.get('JOBS_THREADS', 4)),
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 2,
+    'BACKOFF_MAX': 600,
+    'HEARTBEAT_INTERVAL': 30,
+    'LOCK_TIMEOUT': 120,
+    'POLL_INTERVAL': 1,
+}
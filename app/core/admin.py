@@ -24,9 +24,14 @@ class UserAdmin(BaseUserAdmin):
                 )
             }
         ),
+        (
+            _('Social'),
+            {'fields': ('follows', 'follower_count', 'following_count')},
+        ),
         (_('Activity'), {'fields': ('last_login',)}),
     )
-    readonly_fields = ['last_login']
+    readonly_fields = ['last_login', 'follower_count', 'following_count']
+    raw_id_fields = ['follows']
     add_fieldsets = (
         ('User Information', {
             'classes': ('wide',),
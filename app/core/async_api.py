@@ -0,0 +1,65 @@
+"""
+Helpers for async API views.
+
+DRF views are synchronous, so the async endpoints are plain Django
+function views that share authentication, error handling and rendering
+through ``async_api_view``.
+"""
+import functools
+
+from django.http import Http404, HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+
+from core.authentication import aauthenticate
+from core.renderers import TimedJSONRenderer
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    """Render data the same way DRF's JSON renderer does."""
+    return HttpResponse(
+        TimedJSONRenderer().render(data),
+        status=status_code,
+        content_type='application/json',
+    )
+
+
+def async_api_view(methods):
+    """Wrap an async view with token authentication and API errors.
+
+    The view receives a DRF ``Request`` so paginators and serializers
+    can be reused unchanged.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapped_view(request, *args, **kwargs):
+            if request.method not in methods:
+                return json_response(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status.HTTP_405_METHOD_NOT_ALLOWED,
+                )
+            try:
+                user = await aauthenticate(request)
+                if user is None:
+                    raise NotAuthenticated()
+                api_request = Request(request)
+                api_request.user = user
+                return await view(api_request, *args, **kwargs)
+            except Http404:
+                return json_response(
+                    {'detail': 'Not found.'},
+                    status.HTTP_404_NOT_FOUND,
+                )
+            except APIException as exc:
+                response = json_response(
+                    {'detail': exc.detail}, exc.status_code,
+                )
+                if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                    response['WWW-Authenticate'] = 'Token'
+                return response
+
+        wrapped_view.csrf_exempt = True
+        return wrapped_view
+
+    return decorator
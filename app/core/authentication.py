@@ -0,0 +1,167 @@
+"""
+Authentication backends.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from core.db.sync import database_sync_to_async
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with expiring entries."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for a key, or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Cache a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove a key from the cache."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every key from the cache."""
+        with self._lock:
+            self._data.clear()
+
+
+token_cache = TTLCache(
+    max_size=settings.TOKEN_AUTH_CACHE['LOCAL_MAX_SIZE'],
+    ttl=settings.TOKEN_AUTH_CACHE['LOCAL_TTL'],
+)
+
+
+# The user fields cached in the shared tier, enough for permission checks.
+# Other fields, the password hash among them, are loaded on first access.
+SHARED_USER_FIELDS = ('id', 'is_active', 'is_staff', 'is_superuser')
+
+
+def get_shared_cache():
+    """Return the shared token cache, or None when it is disabled."""
+    alias = settings.TOKEN_AUTH_CACHE['SHARED_ALIAS']
+    if not alias:
+        return None
+    return caches[alias]
+
+
+def shared_cache_key(key):
+    """Return the shared cache key for a token without exposing it."""
+    return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    """Drop a token from every cache tier."""
+    token_cache.delete(key)
+    shared = get_shared_cache()
+    if shared is not None:
+        shared.delete(shared_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token and user lookup.
+
+    Lookups go to an in-process LRU first and then to the optional shared
+    cache before falling back to the database. Entries are dropped when the
+    token is deleted or an authentication field of the user changes; other
+    processes only see that through the shared tier, so ``LOCAL_TTL``
+    bounds how long their in-process copy can be stale.
+
+    The shared tier holds only ``SHARED_USER_FIELDS`` of the user. A user
+    rebuilt from it defers its other fields, which are read from the
+    database if a view accesses them.
+    """
+
+    def to_shared(self, user):
+        """Return the values of a user cached in the shared tier."""
+        return tuple(getattr(user, name) for name in SHARED_USER_FIELDS)
+
+    def from_shared(self, key, values):
+        """Rebuild the user and token cached in the shared tier."""
+        user = get_user_model().from_db(None, SHARED_USER_FIELDS, values)
+        token = self.get_model().from_db(
+            None, ('key', 'user_id'), (key, user.pk),
+        )
+        token.user = user
+        return (user, token)
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            shared = get_shared_cache()
+            values = None
+            if shared is not None:
+                values = shared.get(shared_cache_key(key))
+            if values is not None:
+                cached = self.from_shared(key, values)
+            else:
+                cached = super().authenticate_credentials(key)
+                if shared is not None:
+                    shared.set(
+                        shared_cache_key(key),
+                        self.to_shared(cached[0]),
+                        settings.TOKEN_AUTH_CACHE['SHARED_TTL'],
+                    )
+            token_cache.set(key, cached)
+
+        user, token = cached
+        return (copy.copy(user), token)
+
+
+async def aauthenticate(request):
+    """Authenticate a request from an async view.
+
+    Returns the user, or None when no token was sent. A cached token is
+    resolved without leaving the event loop; otherwise the lookup runs in
+    a worker thread.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b'token' or len(auth) != 2:
+        return None
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        return None
+
+    cached = token_cache.get(key)
+    if cached is not None:
+        user, _ = cached
+        return copy.copy(user)
+    authenticate_credentials = database_sync_to_async(
+        CachedTokenAuthentication().authenticate_credentials,
+    )
+    user, _ = await authenticate_credentials(key)
+    return user
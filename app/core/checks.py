@@ -0,0 +1,34 @@
+"""
+System checks for deployment settings.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_process_local(alias='default'):
+    """Return whether a cache alias is only visible to this process."""
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Require caches shared by every web and worker process.
+
+    ETags and cached profiles compare version tokens that any process may
+    replace, and a replica pin set by one process must be seen by the
+    next, so a per-process cache answers stale data in the others.
+    """
+    errors = []
+    for alias in dict.fromkeys(['default', settings.REPLICA_STICKY_CACHE]):
+        if is_process_local(alias):
+            errors.append(Error(
+                f'The {alias!r} cache is local to each process.',
+                hint='Set REDIS_URL to share the cache between processes.',
+                id='core.E001',
+            ))
+    return errors
@@ -0,0 +1,85 @@
+"""
+Conditional GET answered from cache version tokens.
+
+A view whose payload depends only on a few versioned objects can compare
+If-None-Match and If-Modified-Since against those tokens and return 304
+Not Modified without querying the database or serializing anything.
+"""
+import functools
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from core import cache
+from core.routers import use_replica
+
+
+def version_etag(request, versions):
+    """Return a quoted ETag for a request URL at the given versions."""
+    parts = [
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        *versions,
+    ]
+    return quote_etag(hashlib.sha1('\n'.join(parts).encode()).hexdigest())
+
+
+def version_last_modified(versions):
+    """Return the newest issue time of the versions as an int timestamp.
+
+    Returns None while that is still the current second: Last-Modified has
+    one-second resolution, so a later change in the same second would not
+    look newer than it.
+    """
+    times = [cache.version_time(version) for version in versions]
+    if not times or None in times:
+        return None
+    last_modified = int(max(times))
+    if last_modified >= int(time.time()):
+        return None
+    return last_modified
+
+
+def conditional_on_versions(get_versions):
+    """Decorate a view method to answer conditional GETs from versions.
+
+    ``get_versions(request, *args, **kwargs)`` returns the version tokens
+    the response depends on. They are read before the view runs, so a
+    change committed meanwhile yields a newer payload under an older ETag,
+    which only costs the client one more full response.
+
+    The view reads from the primary: a lagging replica could return data
+    older than the versions, which would then be cached and revalidated
+    under them until they change again.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            versions = get_versions(request, *args, **kwargs)
+            etag = version_etag(request, versions)
+            last_modified = version_last_modified(versions)
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified,
+            )
+            if response is None:
+                token = use_replica.set(False)
+                try:
+                    response = view(self, request, *args, **kwargs)
+                finally:
+                    use_replica.reset(token)
+            if response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                if last_modified is not None:
+                    response.headers.setdefault(
+                        'Last-Modified', http_date(last_modified),
+                    )
+            patch_vary_headers(response, ('Authorization',))
+            return response
+
+        return wrapper
+
+    return decorator
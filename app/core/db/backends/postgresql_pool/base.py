@@ -0,0 +1,77 @@
+"""
+PostgreSQL backend that checks connections out of a shared pool.
+
+Django 4.0 has no built-in pooling: with CONN_MAX_AGE=0 every request opens
+and closes its own connection. This backend keeps Django's per-thread
+connection handling but hands the underlying psycopg2 connection back to a
+process-wide pool on close, so WSGI threads and the thread that runs
+sync_to_async code reuse the same warm connections.
+"""
+import functools
+
+import psycopg2
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+from core.db.pool import get_pool
+
+DEFAULT_POOL_OPTIONS = {
+    'MAX_SIZE': 20,
+    'MAX_LIFETIME': 1800,
+    'TIMEOUT': 10,
+    'CHECK_IDLE': 30,
+}
+
+
+def connect(conn_params):
+    """Open a raw connection the way Django's postgresql backend does."""
+    connection = psycopg2.connect(**conn_params)
+    # Skip psycopg2's JSON decoding, Django decodes jsonb itself.
+    psycopg2.extras.register_default_jsonb(
+        conn_or_curs=connection,
+        loads=lambda x: x,
+    )
+    return connection
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """postgresql DatabaseWrapper backed by a ConnectionPool.
+
+    Pool options come from the ``POOL`` key of the database settings.
+    """
+
+    def get_pool(self, conn_params):
+        options = {
+            **DEFAULT_POOL_OPTIONS,
+            **self.settings_dict.get('POOL', {}),
+        }
+        # The test runner renames the database, so key pools by name too.
+        return get_pool(
+            f'{self.alias}:{conn_params.get("database")}',
+            functools.partial(connect, conn_params),
+            max_size=options['MAX_SIZE'],
+            max_lifetime=options['MAX_LIFETIME'],
+            timeout=options['TIMEOUT'],
+            check_idle=options['CHECK_IDLE'],
+        )
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        connection = self.pool.getconn()
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        """Return the connection to the pool instead of closing it."""
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                return self.pool.putconn(self.connection)
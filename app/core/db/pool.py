@@ -0,0 +1,244 @@
+"""
+Thread-safe database connection pool.
+"""
+import threading
+import time
+from collections import deque
+
+from psycopg2 import Error as DatabaseError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from core import metrics
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available in time."""
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections shared by all threads.
+
+    Checkouts reuse the most recently returned connection, wait when
+    ``max_size`` connections are in use and give up after ``timeout``
+    seconds. Connections older than ``max_lifetime`` are replaced, and
+    connections idle for more than ``check_idle`` seconds are pinged
+    before being handed out.
+    """
+
+    def __init__(self, name, connect, max_size, max_lifetime, timeout,
+                 check_idle):
+        self.name = name
+        self.connect = connect
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self._idle = deque()
+        self._created = {}
+        self._size = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self.waits = 0
+        self.timeouts = 0
+        self.opened = 0
+        self.discarded = 0
+
+    def _expired(self, conn, now):
+        return now - self._created[conn] > self.max_lifetime
+
+    def _healthy(self, conn, last_used, now):
+        """Return whether an idle connection can be handed out."""
+        if (
+            conn.closed
+            or conn.get_transaction_status() != TRANSACTION_STATUS_IDLE
+        ):
+            return False
+        if now - last_used > self.check_idle:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except DatabaseError:
+                return False
+        return True
+
+    def _discard(self, conn):
+        """Close a connection and free its slot. Call with the lock held."""
+        self._created.pop(conn, None)
+        self._size -= 1
+        self.discarded += 1
+        try:
+            conn.close()
+        except DatabaseError:
+            pass
+        self._cond.notify()
+
+    def _reserve(self):
+        """Take an idle connection or a free slot, waiting if neither exists.
+
+        Returns ``(conn, last_used)``, or ``(None, None)`` when the caller
+        should open a new connection in the reserved slot.
+        """
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    self._in_use += 1
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._in_use += 1
+                    return None, None
+                if not waited:
+                    waited = True
+                    self.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'No connection available in pool {self.name!r} '
+                        f'after {self.timeout}s.'
+                    )
+                self._cond.wait(remaining)
+
+    def _open(self):
+        """Open a connection in a reserved slot."""
+        try:
+            conn = self.connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created[conn] = time.monotonic()
+            self.opened += 1
+        return conn
+
+    def getconn(self):
+        """Check out a connection, opening or waiting for one if needed."""
+        started = time.perf_counter()
+        try:
+            while True:
+                conn, last_used = self._reserve()
+                if conn is None:
+                    return self._open()
+                now = time.monotonic()
+                if (
+                    not self._expired(conn, now)
+                    and self._healthy(conn, last_used, now)
+                ):
+                    return conn
+                with self._cond:
+                    self._in_use -= 1
+                    self._discard(conn)
+        finally:
+            metrics.pool_checkout_duration.observe(
+                (self.name,), time.perf_counter() - started,
+            )
+
+    def putconn(self, conn):
+        """Return a connection, discarding it if it is unusable or old."""
+        with self._cond:
+            self._in_use -= 1
+            if conn not in self._created:
+                return
+            if (
+                not conn.closed
+                and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE
+            ):
+                try:
+                    conn.rollback()
+                except DatabaseError:
+                    pass
+            now = time.monotonic()
+            if (
+                conn.closed
+                or conn.get_transaction_status() != TRANSACTION_STATUS_IDLE
+                or self._expired(conn, now)
+            ):
+                self._discard(conn)
+                return
+            self._idle.append((conn, now))
+            self._cond.notify()
+
+    def stats(self):
+        """Return a snapshot of the pool counters."""
+        with self._cond:
+            return {
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'opened': self.opened,
+                'discarded': self.discarded,
+            }
+
+
+pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, connect, **options):
+    """Return the named pool, creating it on first use."""
+    with _pools_lock:
+        pool = pools.get(name)
+        if pool is None:
+            pool = pools[name] = ConnectionPool(name, connect, **options)
+        return pool
+
+
+def _read_stat(stat):
+    """Return a callback reading one stat from every pool."""
+    def read():
+        return {
+            (name,): pool.stats()[stat]
+            for name, pool in list(pools.items())
+        }
+    return read
+
+
+metrics.registry.register(metrics.CallbackMetric(
+    'db_pool_connections_in_use',
+    'Pooled connections checked out.',
+    'gauge',
+    ('pool',),
+    _read_stat('in_use'),
+))
+metrics.registry.register(metrics.CallbackMetric(
+    'db_pool_connections_idle',
+    'Pooled connections waiting for reuse.',
+    'gauge',
+    ('pool',),
+    _read_stat('idle'),
+))
+metrics.registry.register(metrics.CallbackMetric(
+    'db_pool_waits_total',
+    'Checkouts that had to wait for a connection.',
+    'counter',
+    ('pool',),
+    _read_stat('waits'),
+))
+metrics.registry.register(metrics.CallbackMetric(
+    'db_pool_timeouts_total',
+    'Checkouts that gave up waiting for a connection.',
+    'counter',
+    ('pool',),
+    _read_stat('timeouts'),
+))
+metrics.registry.register(metrics.CallbackMetric(
+    'db_pool_opened_total',
+    'Connections opened by the pool.',
+    'counter',
+    ('pool',),
+    _read_stat('opened'),
+))
+metrics.registry.register(metrics.CallbackMetric(
+    'db_pool_discarded_total',
+    'Connections closed for age or failed health checks.',
+    'counter',
+    ('pool',),
+    _read_stat('discarded'),
+))
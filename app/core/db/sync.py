@@ -0,0 +1,27 @@
+"""
+Database access from async code.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+
+def database_sync_to_async(func):
+    """Wrap ``func`` like ``sync_to_async`` and release its connection after.
+
+    Under ASGI, Django 4.0 runs the sync code of each request in a thread
+    of its own, and a connection opened there is not closed at the end of
+    the request, so every concurrent request would hold a connection (or
+    a pool slot) until its thread is collected. Connections inside a
+    transaction the caller owns, as in tests, are left open.
+    """
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if not connection.in_atomic_block:
+                connection.close()
+
+    return sync_to_async(call)
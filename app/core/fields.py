@@ -0,0 +1,116 @@
+"""
+Sparse fieldsets and relation expansion for read endpoints.
+
+``?fields=id,tweet_text`` limits a response to the named fields and
+``?expand=user`` outputs a relation as nested objects instead of ids.
+Expanding a relation also selects it. Views read the selection once, and
+both their serializer and their queryset consult it, so a field that is
+not output is never annotated, joined or prefetched.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+def _names(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class FieldSelection:
+    """The fields and expanded relations a request asked for."""
+
+    def __init__(self, fields=None, expand=()):
+        self.fields = None if fields is None else frozenset(fields)
+        self.expand = frozenset(expand)
+
+    @classmethod
+    def from_request(cls, request, fields, expandable=()):
+        """Parse a request's selection among ``fields`` and ``expandable``.
+
+        Unknown names are rejected. Writes always respond with every field.
+        """
+        if request.method not in SAFE_METHODS:
+            return cls()
+        selected = _names(request, FIELDS_QUERY_PARAM)
+        expand = _names(request, EXPAND_QUERY_PARAM) or set()
+        errors = {}
+        unknown = (selected or set()) - set(fields) - set(expandable)
+        if unknown:
+            errors[FIELDS_QUERY_PARAM] = [
+                f'Unknown fields: {", ".join(sorted(unknown))}.',
+            ]
+        unknown = expand - set(expandable)
+        if unknown:
+            errors[EXPAND_QUERY_PARAM] = [
+                f'Cannot expand: {", ".join(sorted(unknown))}.',
+            ]
+        if errors:
+            raise ValidationError(errors)
+        return cls(selected, expand)
+
+    def includes(self, name):
+        """Return whether the field ``name`` is output."""
+        return (
+            self.fields is None
+            or name in self.fields
+            or name in self.expand
+        )
+
+    def expands(self, name):
+        """Return whether the relation ``name`` is output as nested objects."""
+        return name in self.expand
+
+
+def selection_for(request, serializer_class):
+    """Return the request's field selection for a serializer class."""
+    expandable = getattr(serializer_class, 'expanded_fields', {})
+    return FieldSelection.from_request(
+        request,
+        [*serializer_class.Meta.fields, *expandable],
+        expandable,
+    )
+
+
+class SparseFieldsMixin:
+    """Serializer mixin applying the context's ``field_selection``.
+
+    ``expanded_fields`` maps each expandable relation to a factory for the
+    nested serializer that outputs it when expanded.
+    """
+    expanded_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.context.get('field_selection')
+        if selection is None:
+            return fields
+        for name, factory in self.expanded_fields.items():
+            if selection.expands(name):
+                fields[name] = factory()
+        return {
+            name: field for name, field in fields.items()
+            if field.write_only or selection.includes(name)
+        }
+
+
+class FieldSelectionMixin:
+    """View mixin passing the request's field selection to serializers."""
+
+    def get_field_selection(self):
+        """Return the field selection for the view's serializer class."""
+        if not hasattr(self, '_field_selection'):
+            self._field_selection = selection_for(
+                self.request,
+                self.get_serializer_class(),
+            )
+        return self._field_selection
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['field_selection'] = self.get_field_selection()
+        return context
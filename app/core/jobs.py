@@ -0,0 +1,294 @@
+"""
+Durable background jobs stored in PostgreSQL.
+
+``enqueue`` inserts a Job row, normally inside the caller's transaction, so
+a job exists exactly when the write that needs it committed. Workers started
+by the ``run_jobs`` command claim due jobs with ``FOR UPDATE SKIP LOCKED``,
+so any number of threads and processes can poll one table without blocking
+each other or running a job twice.
+
+A job runs ``name`` (the dotted path of a module-level function) with its
+payload as keyword arguments, in a transaction, so a failed run leaves no
+partial writes behind. Successful jobs are deleted; failed ones are
+retried with exponential backoff until ``max_attempts`` and then kept with
+status ``failed`` and the last traceback.
+"""
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+# First key of the advisory locks that serialize claims on limited queues.
+CLAIM_LOCK_CLASS = 72841
+
+
+def enqueue(func, *, queue='default', priority=0, delay=0,
+            max_attempts=None, **payload):
+    """Queue a call of the module-level function ``func`` with ``payload``.
+
+    Higher ``priority`` jobs of a queue run first; ``delay`` postpones the
+    job by that many seconds.
+    """
+    return Job.objects.create(
+        queue=queue,
+        name=f'{func.__module__}.{func.__qualname__}',
+        payload=payload,
+        priority=priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS['MAX_ATTEMPTS'],
+    )
+
+
+def _claim_sql():
+    table = connection.ops.quote_name(Job._meta.db_table)
+    return (
+        f'UPDATE {table} SET status = %(running)s, locked_at = %(now)s, '
+        'locked_by = %(worker_id)s, attempts = attempts + 1 '
+        f'WHERE id = (SELECT id FROM {table} '
+        '  WHERE queue = %(queue)s AND status = %(queued)s '
+        '  AND run_at <= %(now)s '
+        '  ORDER BY priority DESC, run_at, id '
+        '  LIMIT 1 FOR UPDATE SKIP LOCKED) '
+        'RETURNING id, name, payload, attempts, max_attempts'
+    )
+
+
+def claim(queue, worker_id):
+    """Claim the next due job of a queue, or return None.
+
+    Queues with a limit in ``JOBS['QUEUES']`` never have more jobs running
+    than that across all workers: claims on them take a transaction-level
+    advisory lock, so the running count cannot change between the check
+    and the claim.
+    """
+    limit = settings.JOBS['QUEUES'].get(queue)
+    with transaction.atomic(), connection.cursor() as cursor:
+        if limit:
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s, hashtext(%s))',
+                [CLAIM_LOCK_CLASS, queue],
+            )
+            running = Job.objects.filter(
+                queue=queue,
+                status=Job.Status.RUNNING,
+            ).count()
+            if running >= limit:
+                return None
+        # The application clock, which enqueue and backoff set run_at
+        # from, rather than now(), which is frozen at the transaction start.
+        cursor.execute(_claim_sql(), {
+            'running': Job.Status.RUNNING,
+            'queued': Job.Status.QUEUED,
+            'now': timezone.now(),
+            'worker_id': worker_id,
+            'queue': queue,
+        })
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    job_id, name, payload, attempts, max_attempts = row
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    return job_id, name, payload, attempts, max_attempts
+
+
+def backoff(attempts):
+    """Return the delay in seconds before retrying after ``attempts`` runs."""
+    delay = min(
+        settings.JOBS['BACKOFF_MAX'],
+        settings.JOBS['BACKOFF_BASE'] * 2 ** (attempts - 1),
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+def perform(job_id, name, payload, attempts, max_attempts):
+    """Run a claimed job and record its outcome.
+
+    Returns whether the job succeeded.
+    """
+    try:
+        with transaction.atomic():
+            import_string(name)(**payload)
+    except Exception:
+        logger.exception(
+            'Job %s (%s) failed on attempt %s.', job_id, name, attempts,
+        )
+        changes = {
+            'last_error': traceback.format_exc(),
+            'locked_at': None,
+            'locked_by': '',
+        }
+        if attempts >= max_attempts:
+            changes['status'] = Job.Status.FAILED
+        else:
+            changes['status'] = Job.Status.QUEUED
+            changes['run_at'] = timezone.now() + timedelta(
+                seconds=backoff(attempts),
+            )
+        Job.objects.filter(id=job_id).update(**changes)
+        return False
+
+    Job.objects.filter(id=job_id).delete()
+    return True
+
+
+class Heartbeat:
+    """Refresh ``locked_at`` of a running job until the block exits.
+
+    Workers beat every ``JOBS['HEARTBEAT_INTERVAL']`` seconds from a thread
+    with its own connection, so ``release_stale`` can tell a long job from
+    one whose worker died.
+    """
+
+    def __init__(self, job_id, worker_id):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.stop = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run,
+            name=f'{worker_id}-heartbeat',
+            daemon=True,
+        )
+
+    def beat(self):
+        """Mark the job as still running and return whether it still is."""
+        return Job.objects.filter(
+            id=self.job_id,
+            status=Job.Status.RUNNING,
+            locked_by=self.worker_id,
+        ).update(locked_at=timezone.now()) > 0
+
+    def run(self):
+        try:
+            while not self.stop.wait(settings.JOBS['HEARTBEAT_INTERVAL']):
+                if not self.beat():
+                    logger.warning(
+                        'Job %s was released while running.', self.job_id,
+                    )
+                    return
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        self.thread.join()
+
+
+def release_stale():
+    """Requeue jobs whose worker stopped reporting, and return how many.
+
+    A running job without a heartbeat for ``JOBS['LOCK_TIMEOUT']`` seconds
+    is assumed to have lost its worker. The interrupted run counts as an
+    attempt.
+    """
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(
+            seconds=settings.JOBS['LOCK_TIMEOUT'],
+        ),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.Status.FAILED,
+        locked_at=None,
+        locked_by='',
+    )
+    requeued = stale.update(
+        status=Job.Status.QUEUED,
+        run_at=timezone.now(),
+        locked_at=None,
+        locked_by='',
+    )
+    return failed + requeued
+
+
+class Worker:
+    """Loop claiming and running jobs from a list of queues."""
+
+    def __init__(self, queues, worker_id):
+        self.queues = list(queues)
+        self.worker_id = worker_id
+
+    def run_once(self):
+        """Run one due job from the first queue that has one."""
+        for queue in self.queues:
+            job = claim(queue, self.worker_id)
+            if job is not None:
+                # Start with the next queue so one busy queue cannot starve
+                # the others.
+                index = self.queues.index(queue)
+                self.queues = self.queues[index + 1:] + self.queues[:index + 1]
+                with Heartbeat(job[0], self.worker_id):
+                    perform(*job)
+                return True
+        return False
+
+    def run(self, stop):
+        """Run jobs until the ``stop`` event is set."""
+        try:
+            while not stop.is_set():
+                ran = self.run_once()
+                close_old_connections()
+                if not ran:
+                    stop.wait(settings.JOBS['POLL_INTERVAL'])
+        finally:
+            connection.close()
+
+
+def run_pending(queues=None, worker_id='inline'):
+    """Run due jobs on the current thread until none are left.
+
+    Returns the number of jobs run. Used by ``run_jobs --burst`` and tests.
+    """
+    worker = Worker(queues or settings.JOBS['QUEUES'], worker_id)
+    count = 0
+    while worker.run_once():
+        count += 1
+    return count
+
+
+def start_threads(queues, threads, name_prefix, stop):
+    """Start ``threads`` worker threads and return them."""
+    workers = []
+    for index in range(threads):
+        worker_id = f'{name_prefix}-{index}'
+        thread = threading.Thread(
+            target=Worker(queues, worker_id).run,
+            args=(stop,),
+            name=worker_id,
+        )
+        thread.start()
+        workers.append(thread)
+    return workers
+
+
+def run_stale_reaper(stop):
+    """Release stale jobs every ``JOBS['LOCK_TIMEOUT']`` until stopped."""
+    while not stop.wait(settings.JOBS['LOCK_TIMEOUT']):
+        released = release_stale()
+        if released:
+            logger.warning('Released %s stale jobs.', released)
+        close_old_connections()
+
+
+def worker_name():
+    """Return a worker id prefix unique to this process."""
+    return f'{socket.gethostname()}-{os.getpid()}-{int(time.time())}'
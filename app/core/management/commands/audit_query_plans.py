@@ -0,0 +1,140 @@
+"""
+Django command to check the query plans of hot ORM queries.
+
+Each query runs under ``EXPLAIN (ANALYZE, BUFFERS)`` against the configured
+database, so run ``seed_social_graph`` first: on near-empty tables the
+planner rightly prefers sequential scans. The command fails when a plan
+scans or sorts more rows than the thresholds allow.
+"""
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.models import TimelineEntry, Tweet
+from tweet.timeline import high_follower_ids
+
+
+def walk(node):
+    """Yield a plan node and all of its descendants."""
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk(child)
+
+
+def rows_read(node):
+    """Return the rows a node read, including those its filter removed."""
+    loops = node.get('Actual Loops', 1)
+    rows = node.get('Actual Rows', 0) + node.get('Rows Removed by Filter', 0)
+    return rows * loops
+
+
+def find_problems(plan, max_seq_scan_rows, max_sort_rows):
+    """Return descriptions of plan nodes over the thresholds."""
+    problems = []
+    for node in walk(plan['Plan']):
+        node_type = node['Node Type']
+        if node_type == 'Seq Scan' and rows_read(node) > max_seq_scan_rows:
+            problems.append(
+                f'Seq Scan on {node["Relation Name"]} '
+                f'read {rows_read(node)} rows'
+            )
+        elif node_type in ('Sort', 'Incremental Sort'):
+            sorted_rows = 0
+            if node.get('Plans'):
+                sorted_rows = rows_read(node['Plans'][0])
+            if sorted_rows > max_sort_rows:
+                problems.append(f'{node_type} over {sorted_rows} rows')
+            elif node.get('Sort Space Type') == 'Disk':
+                problems.append(f'{node_type} spilled to disk')
+    return problems
+
+
+class Command(BaseCommand):
+    """Django command to EXPLAIN hot queries and flag bad plans."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-seq-scan-rows', type=int, default=1000)
+        parser.add_argument('--max-sort-rows', type=int, default=1000)
+        parser.add_argument('--output', help='Write the plans as JSON.')
+
+    def sample_users(self):
+        """Return the most followed user and the user following the most."""
+        users = get_user_model().objects
+        popular = users.filter(
+            follower_count__gt=0,
+        ).order_by('-follower_count', 'id').first()
+        reader = users.filter(
+            following_count__gt=0,
+        ).order_by('-following_count', 'id').first()
+        if popular is None or reader is None:
+            raise CommandError(
+                'No follows found, run seed_social_graph first.',
+            )
+        return popular, reader
+
+    def queries(self, popular, reader):
+        """Return (name, queryset) pairs mirroring the API's hot paths."""
+        User = get_user_model()
+        limit = settings.REST_FRAMEWORK['PAGE_SIZE'] + 1
+        users = User.objects.only('id', 'name', 'email').order_by('-id')
+        return [
+            ('tweet-list', Tweet.objects.filter(
+                user=popular,
+            ).with_liked_by(reader).order_by('-id')[:limit]),
+            ('timeline-pushed', TimelineEntry.objects.filter(
+                owner=reader,
+            ).order_by('-tweet_id').values_list(
+                'tweet_id', flat=True,
+            )[:limit]),
+            ('timeline-pulled', Tweet.objects.filter(
+                user_id__in=high_follower_ids(reader),
+            ).order_by('-id').values_list('id', flat=True)[:limit]),
+            ('profile', User.objects.with_counts().filter(pk=popular.pk)),
+            ('following', users.filter(followers=reader.pk)[:limit]),
+            ('followers', users.filter(follows=popular.pk)[:limit]),
+            ('liked-tweets', Tweet.objects.filter(
+                likes=reader.pk,
+            ).only('id', 'tweet_text').order_by('-id')[:limit]),
+            ('recent-tweets', Tweet.objects.order_by('-created')[:limit]),
+        ]
+
+    def explain(self, queryset):
+        """Run a queryset under EXPLAIN ANALYZE and return the JSON plan."""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}', params,
+            )
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        popular, reader = self.sample_users()
+        plans = {}
+        failures = 0
+        for name, queryset in self.queries(popular, reader):
+            plan = self.explain(queryset)
+            plans[name] = plan
+            problems = find_problems(
+                plan,
+                options['max_seq_scan_rows'],
+                options['max_sort_rows'],
+            )
+            self.stdout.write(f'{name:16} {plan["Execution Time"]:.2f}ms')
+            for problem in problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'  {problem}'))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(plans, f, indent=2)
+
+        if failures:
+            raise CommandError(f'{failures} query plan problem(s) found.')
+        self.stdout.write(self.style.SUCCESS('All query plans passed.'))
@@ -0,0 +1,151 @@
+"""
+Django command to benchmark the tweet and user endpoints in-process.
+
+Requests go through the Django test client against the configured
+database, so run ``seed_social_graph`` first. Results are written as JSON
+so runs from different commits can be compared.
+"""
+import json
+import random
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Tweet
+
+
+def percentile(values, pct):
+    """Return the pct percentile of sorted values."""
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def rows_serialized(data):
+    """Return the number of top-level rows in a response payload."""
+    if isinstance(data, dict) and 'results' in data:
+        return len(data['results'])
+    if isinstance(data, list):
+        return len(data)
+    return 1
+
+
+def git_revision():
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Django command to report latency and query counts per endpoint."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_api.json')
+
+    def endpoints(self, user, tweet_id):
+        """Return the (name, method, url) tuples to benchmark for a user."""
+        return [
+            ('tweet-list', 'get', reverse('tweet:tweet-list')),
+            (
+                'tweet-detail',
+                'get',
+                reverse('tweet:tweet-detail', args=[tweet_id]),
+            ),
+            ('timeline', 'get', reverse('tweet:timeline')),
+            ('me', 'get', reverse('user:me')),
+            ('followings', 'get', reverse('user:followings')),
+            ('followers', 'get', reverse('user:followers', args=[user.id])),
+            ('likes', 'get', reverse('user:likes', args=[user.id])),
+            ('like', 'post', reverse('tweet:like', args=[tweet_id])),
+            ('unlike', 'delete', reverse('tweet:like', args=[tweet_id])),
+        ]
+
+    def run_requests(self, rng, tweets, users, iterations):
+        """Send every endpoint request per iteration and collect samples."""
+        samples = {}
+        for _ in range(iterations):
+            user_id, tweet_id = rng.choice(tweets)
+            user = users[user_id]
+            client = APIClient()
+            client.force_authenticate(user)
+            for name, method, url in self.endpoints(user, tweet_id):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    res = getattr(client, method)(url)
+                    elapsed = time.perf_counter() - started
+                if res.status_code >= 400:
+                    raise CommandError(f'{name} returned {res.status_code}.')
+                sample = samples.setdefault(
+                    name, {'ms': [], 'queries': [], 'rows': []},
+                )
+                sample['ms'].append(elapsed * 1000)
+                sample['queries'].append(len(queries))
+                sample['rows'].append(
+                    rows_serialized(getattr(res, 'data', None)),
+                )
+
+        return samples
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rng = random.Random(options['seed'])
+        tweets = list(Tweet.objects.order_by('-like_count').values_list(
+            'user_id', 'id',
+        )[:options['users']])
+        if not tweets:
+            raise CommandError('No tweets found, run seed_social_graph first.')
+        users = get_user_model().objects.in_bulk(
+            [user_id for user_id, _ in tweets],
+        )
+
+        # The test client sends requests for the 'testserver' host.
+        allowed_hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=allowed_hosts):
+            samples = self.run_requests(
+                rng, tweets, users, options['iterations'],
+            )
+
+        results = {}
+        for name, sample in samples.items():
+            latencies = sorted(sample['ms'])
+            results[name] = {
+                'requests': len(latencies),
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99),
+                'queries_per_request': statistics.mean(sample['queries']),
+                'max_queries': max(sample['queries']),
+                'rows_per_request': statistics.mean(sample['rows']),
+            }
+            self.stdout.write(
+                f'{name:14} p50={results[name]["p50_ms"]:.2f}ms '
+                f'p95={results[name]["p95_ms"]:.2f}ms '
+                f'p99={results[name]["p99_ms"]:.2f}ms '
+                f'queries={results[name]["queries_per_request"]:.1f} '
+                f'rows={results[name]["rows_per_request"]:.1f}'
+            )
+
+        with open(options['output'], 'w') as f:
+            json.dump({
+                'revision': git_revision(),
+                'iterations': options['iterations'],
+                'endpoints': results,
+            }, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Results written to {options["output"]}.'
+        ))
@@ -0,0 +1,145 @@
+"""
+Django command to load test an endpoint with many concurrent connections.
+
+Run it once against a WSGI server and once against an ASGI server to
+compare the sync and async views, e.g.::
+
+    gunicorn app.wsgi -w 4 --threads 32
+    uvicorn app.asgi:application --workers 4
+    python manage.py bench_concurrency --token <key> \
+        --url http://127.0.0.1:8000/api/tweet/timeline/
+    python manage.py bench_concurrency --token <key> \
+        --url http://127.0.0.1:8000/api/tweet/async/timeline/
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def percentile(values, pct):
+    """Return the pct percentile of sorted values."""
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response and return its status code."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server.')
+    length = 0
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def run_connection(url, request, deadline, latencies, errors):
+    """Send requests over one keep-alive connection until the deadline."""
+    try:
+        reader, writer = await asyncio.open_connection(
+            url.hostname, url.port or 80,
+        )
+    except OSError:
+        errors.append('connect')
+        return
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+    except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+        errors.append('connection')
+    finally:
+        writer.close()
+
+
+async def run_benchmark(url, request, connections, duration):
+    """Run all connections for the given duration and collect results."""
+    latencies = []
+    errors = []
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        run_connection(url, request, deadline, latencies, errors)
+        for _ in range(connections)
+    ])
+    return latencies, errors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    """Django command to measure requests/sec and latency under load."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', required=True)
+        parser.add_argument('--token', default=None)
+        parser.add_argument('--method', default='GET')
+        parser.add_argument('--connections', type=int, default=1000)
+        parser.add_argument('--duration', type=float, default=30.0)
+        parser.add_argument('--output', default=None)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        url = urlsplit(options['url'])
+        if url.scheme != 'http':
+            raise CommandError('Only http:// URLs are supported.')
+        path = url.path + (f'?{url.query}' if url.query else '')
+        headers = [
+            f'{options["method"]} {path} HTTP/1.1',
+            f'Host: {url.netloc}',
+            'Connection: keep-alive',
+            'Content-Length: 0',
+        ]
+        if options['token']:
+            headers.append(f'Authorization: Token {options["token"]}')
+        request = ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1')
+
+        self.stdout.write(
+            f'Running {options["connections"]} connections against '
+            f'{options["url"]} for {options["duration"]}s...'
+        )
+        latencies, errors, elapsed = asyncio.run(run_benchmark(
+            url, request, options['connections'], options['duration'],
+        ))
+        latencies.sort()
+        result = {
+            'url': options['url'],
+            'method': options['method'],
+            'connections': options['connections'],
+            'requests': len(latencies),
+            'errors': len(errors),
+            'requests_per_second': len(latencies) / elapsed,
+            'p50_ms': (percentile(latencies, 50) or 0) * 1000,
+            'p99_ms': (percentile(latencies, 99) or 0) * 1000,
+        }
+
+        output = json.dumps(result, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        self.stdout.write(output)
@@ -0,0 +1,121 @@
+"""
+Django command to benchmark list serialization in-process.
+
+Each case fetches and serializes the same rows twice: as model instances
+through the ``ModelSerializer`` the endpoints used to list with, and as
+``values()`` rows through the ``RowSerializer`` they list with now. Run
+``seed_social_graph`` first. Results are written as JSON so runs from
+different commits can be compared.
+"""
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.management.commands.bench_api import git_revision
+from core.models import Tweet
+from tweet.serializers import TweetRowSerializer, TweetSerializer
+from user.serializers import (
+    FollowSerializer,
+    LikedTweetRowSerializer,
+    LikedTweetSerializer,
+    UserRowSerializer,
+)
+
+
+def best_time(func, repeat):
+    """Return the fastest of ``repeat`` calls of ``func`` and its result."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+class Command(BaseCommand):
+    """Django command to report list serialization throughput."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', default='bench_serializers.json')
+
+    def cases(self, user, rows):
+        """Return (name, model path, row path) callables for each case."""
+        tweets = Tweet.objects.with_liked_by(user).order_by('-id')[:rows]
+        users = get_user_model().objects.order_by('-id')
+        liked = Tweet.objects.order_by('-id')
+
+        return [
+            (
+                'tweets',
+                lambda: TweetSerializer(list(tweets.all()), many=True).data,
+                lambda: TweetRowSerializer(
+                    list(tweets.values(*TweetRowSerializer.fields)), many=True,
+                ).data,
+            ),
+            (
+                'users',
+                lambda: FollowSerializer(
+                    list(users.only(*FollowSerializer.Meta.fields)[:rows]),
+                    many=True,
+                ).data,
+                lambda: UserRowSerializer(
+                    list(users.values(*UserRowSerializer.fields)[:rows]),
+                    many=True,
+                ).data,
+            ),
+            (
+                'liked-tweets',
+                lambda: LikedTweetSerializer(
+                    list(liked.only(*LikedTweetSerializer.Meta.fields)[:rows]),
+                    many=True,
+                ).data,
+                lambda: LikedTweetRowSerializer(
+                    list(liked.values(
+                        *LikedTweetRowSerializer.fields,
+                    )[:rows]),
+                    many=True,
+                ).data,
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        user = get_user_model().objects.order_by('id').first()
+        if user is None or not Tweet.objects.exists():
+            raise CommandError('No tweets found, run seed_social_graph first.')
+
+        results = {}
+        for name, model_path, row_path in self.cases(user, options['rows']):
+            model_time, model_data = best_time(model_path, options['repeat'])
+            row_time, row_data = best_time(row_path, options['repeat'])
+            if json.loads(json.dumps(model_data)) != row_data:
+                raise CommandError(f'{name}: row serializer output differs.')
+            count = len(row_data)
+            results[name] = {
+                'rows': count,
+                'model_rows_per_sec': count / model_time,
+                'row_rows_per_sec': count / row_time,
+                'speedup': model_time / row_time,
+            }
+            self.stdout.write(
+                f'{name:14} rows={count} '
+                f'model={results[name]["model_rows_per_sec"]:.0f}/s '
+                f'row={results[name]["row_rows_per_sec"]:.0f}/s '
+                f'speedup={results[name]["speedup"]:.2f}x'
+            )
+
+        with open(options['output'], 'w') as f:
+            json.dump({
+                'revision': git_revision(),
+                'repeat': options['repeat'],
+                'cases': results,
+            }, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Results written to {options["output"]}.'
+        ))
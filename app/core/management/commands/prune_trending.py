@@ -0,0 +1,17 @@
+"""
+Django command to delete expired trending hashtag counters.
+"""
+from django.core.management.base import BaseCommand
+
+from tweet import trending
+
+
+class Command(BaseCommand):
+    """Django command to drop counter buckets older than every window."""
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        deleted = trending.prune_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} expired buckets.'
+        ))
@@ -0,0 +1,48 @@
+"""
+Django command to repair drifted follower and following counts.
+
+Counts are recounted from the follows table one id range at a time, each
+range in its own short transaction, so large tables are never locked as a
+whole. Only rows whose counts are wrong are written.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from user import follows, profiles
+
+
+class Command(BaseCommand):
+    """Django command to recount follow counts in chunks of user ids."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Seconds to pause between chunks to limit load.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        bounds = get_user_model().objects.aggregate(
+            low=Min('id'), high=Max('id'),
+        )
+        if bounds['low'] is None:
+            self.stdout.write(self.style.SUCCESS('No users to reconcile.'))
+            return
+
+        repaired = 0
+        for low in range(bounds['low'] - 1, bounds['high'], chunk_size):
+            user_ids = follows.recount_range(low, low + chunk_size)
+            profiles.invalidate_profiles(user_ids)
+            repaired += len(user_ids)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'Repaired {repaired} users.'))
@@ -0,0 +1,37 @@
+"""
+Django command to refresh the cached popular tweets.
+
+Run it periodically, more often than POPULAR_CACHE_TIMEOUT, so reads
+always find the top tweets in cache. The list is written to the default
+cache, so it only reaches the web processes when that cache is shared.
+"""
+from django.core.management.base import BaseCommand
+
+from core.checks import is_process_local
+from tweet import popular
+
+
+class Command(BaseCommand):
+    """Django command to prune popularity candidates and cache the top K."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Rescore all recent liked tweets first, e.g. after seeding.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['rebuild']:
+            scored = popular.rebuild_scores()
+            self.stdout.write(f'Rescored {scored} tweets.')
+        if is_process_local():
+            self.stderr.write(
+                'The default cache is local to this process, so web '
+                'processes will not see the refreshed list. Set REDIS_URL.'
+            )
+        top = popular.refresh_top()
+        self.stdout.write(self.style.SUCCESS(
+            f'Cached {len(top)} popular tweets.'
+        ))
@@ -0,0 +1,103 @@
+"""
+Django command to run background jobs.
+"""
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import jobs
+from core.checks import is_process_local
+
+
+def run_process(queues, threads, reap):
+    """Run worker threads until SIGTERM or SIGINT."""
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: stop.set())
+    workers = jobs.start_threads(queues, threads, jobs.worker_name(), stop)
+    if reap:
+        jobs.run_stale_reaper(stop)
+    for worker in workers:
+        worker.join()
+
+
+class Command(BaseCommand):
+    """Django command to claim and run queued jobs.
+
+    Each process runs ``--threads`` worker threads. Use threads for jobs
+    that wait on I/O or release the GIL, and ``--processes`` to spread
+    CPU-bound Python work over cores.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='append',
+            dest='queues',
+            help=(
+                'Queue to run, may be repeated. '
+                'Defaults to every queue in JOBS.'
+            ),
+        )
+        parser.add_argument(
+            '--threads', type=int, default=settings.JOBS['THREADS'],
+        )
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Run due jobs on the main thread, then exit.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        queues = options['queues'] or list(settings.JOBS['QUEUES'])
+        if is_process_local():
+            # Jobs such as render_renditions invalidate cached profiles.
+            self.stderr.write(
+                'The default cache is local to this process, so cache '
+                'invalidations by jobs will not reach web processes. '
+                'Set REDIS_URL.'
+            )
+        if options['burst']:
+            count = jobs.run_pending(queues)
+            self.stdout.write(self.style.SUCCESS(f'Ran {count} jobs.'))
+            return
+        if options['threads'] < 1 or options['processes'] < 1:
+            raise CommandError('--threads and --processes must be at least 1.')
+
+        self.stdout.write(
+            f'Running {options["processes"]}x{options["threads"]} workers '
+            f'for queues: {", ".join(queues)}.'
+        )
+        if options['processes'] == 1:
+            run_process(queues, options['threads'], reap=True)
+            return
+
+        # Children must not share the parent's database connections.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(
+                target=run_process,
+                args=(queues, options['threads'], index == 0),
+            )
+            for index in range(options['processes'])
+        ]
+        for child in children:
+            child.start()
+        signal.signal(
+            signal.SIGTERM,
+            lambda *args: [child.terminate() for child in children],
+        )
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            # SIGINT reaches the children too; wait for them to finish.
+            for child in children:
+                child.join()
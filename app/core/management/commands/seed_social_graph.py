@@ -0,0 +1,168 @@
+"""
+Django command to seed a synthetic social graph for local benchmarking.
+"""
+import itertools
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import TimelineEntry, Tweet, count_related
+from tweet import tags
+from user import follows
+
+
+def power_law_weights(count, exponent):
+    """Return cumulative Zipf weights for ranks 1..count."""
+    return list(itertools.accumulate(
+        1 / (rank ** exponent) for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    """Django command to generate users, follows, tweets and likes."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--tweets', type=int, default=100000)
+        parser.add_argument('--follows-per-user', type=int, default=50)
+        parser.add_argument('--likes', type=int, default=500000)
+        parser.add_argument('--exponent', type=float, default=1.1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--no-fan-out',
+            action='store_true',
+            help='Skip filling the precomputed home timelines.',
+        )
+
+    def log(self, message):
+        self.stdout.write(message)
+
+    def bulk_insert(self, model, rows):
+        """Insert rows in batches, skipping duplicates."""
+        batch_size = self.options['batch_size']
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.options = options
+        rng = random.Random(options['seed'])
+        User = get_user_model()
+
+        self.log(f'Creating {options["users"]} users...')
+        password = make_password('seedpass123')
+        prefix = options['prefix']
+        self.bulk_insert(User, (
+            User(
+                email=f'{prefix}{i}@example.com',
+                name=f'{prefix} {i}',
+                password=password,
+            )
+            for i in range(options['users'])
+        ))
+        user_ids = list(User.objects.filter(
+            email__startswith=prefix,
+            email__endswith='@example.com',
+        ).order_by('id').values_list('id', flat=True))
+        # Popularity follows rank in a shuffled order so ids do not predict it.
+        ranked = user_ids[:]
+        rng.shuffle(ranked)
+        weights = power_law_weights(len(ranked), options['exponent'])
+
+        self.log('Creating a power-law follow graph...')
+        Follow = User.follows.through
+        self.bulk_insert(Follow, (
+            Follow(from_user_id=user_id, to_user_id=followee_id)
+            for user_id in user_ids
+            for followee_id in set(rng.choices(
+                ranked,
+                cum_weights=weights,
+                k=max(1, int(rng.expovariate(
+                    1 / options['follows_per_user'],
+                ))),
+            ))
+            if followee_id != user_id
+        ))
+        follows.recount_range(user_ids[0] - 1, user_ids[-1])
+
+        self.log(f'Creating {options["tweets"]} tweets...')
+        authors = rng.choices(ranked, cum_weights=weights, k=options['tweets'])
+        last_id = Tweet.objects.order_by('-id').values_list(
+            'id', flat=True,
+        ).first()
+        self.bulk_insert(Tweet, (
+            Tweet(
+                user_id=author_id,
+                tweet_text=f'Seed tweet {i} #seed{i % 100}',
+            )
+            for i, author_id in enumerate(authors)
+        ))
+        # bulk_create sends no post_save, so index the new tweets' tags here.
+        tags.index_tweets(
+            Tweet.objects.filter(id__gt=last_id or 0).values_list(
+                'id', 'tweet_text', 'created',
+            ).iterator(chunk_size=options['batch_size']),
+            options['batch_size'],
+        )
+
+        self.log(f'Creating {options["likes"]} skewed likes...')
+        tweet_ids = list(Tweet.objects.filter(
+            user_id__in=user_ids,
+        ).order_by('-id').values_list('id', flat=True)[:options['tweets']])
+        tweet_weights = power_law_weights(len(tweet_ids), options['exponent'])
+        Like = Tweet.likes.through
+        self.bulk_insert(Like, (
+            Like(tweet_id=tweet_id, user_id=rng.choice(user_ids))
+            for tweet_id in rng.choices(
+                tweet_ids, cum_weights=tweet_weights, k=options['likes'],
+            )
+        ))
+        Tweet.objects.filter(id__in=tweet_ids).update(
+            like_count=count_related(Like, 'tweet'),
+        )
+
+        if not options['no_fan_out']:
+            self.log('Filling home timelines...')
+            self.fan_out(user_ids)
+
+        self.stdout.write(self.style.SUCCESS('Social graph seeded.'))
+
+    def fan_out(self, user_ids):
+        """Push seeded tweets into their authors' and followers' timelines."""
+        User = get_user_model()
+        Follow = User.follows.through
+        quote = connection.ops.quote_name
+        sql = (
+            'INSERT INTO {timeline} (owner_id, tweet_id) '
+            'SELECT f.from_user_id, t.id FROM {tweets} t '
+            'JOIN {follows} f ON f.to_user_id = t.user_id '
+            'JOIN {users} u ON u.id = t.user_id '
+            'WHERE t.user_id = ANY(%s) AND u.follower_count < %s '
+            'ON CONFLICT DO NOTHING'
+        ).format(
+            timeline=quote(TimelineEntry._meta.db_table),
+            tweets=quote(Tweet._meta.db_table),
+            follows=quote(Follow._meta.db_table),
+            users=quote(User._meta.db_table),
+        )
+        own_sql = (
+            'INSERT INTO {timeline} (owner_id, tweet_id) '
+            'SELECT user_id, id FROM {tweets} WHERE user_id = ANY(%s) '
+            'ON CONFLICT DO NOTHING'
+        ).format(
+            timeline=quote(TimelineEntry._meta.db_table),
+            tweets=quote(Tweet._meta.db_table),
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, [user_ids, settings.TIMELINE_FANOUT_THRESHOLD])
+            cursor.execute(own_sql, [user_ids])
@@ -0,0 +1,221 @@
+"""
+In-process request metrics with Prometheus text exposition.
+
+Each process keeps its own histograms, so a scrape of /metrics reports only
+the worker that served it. Under a multi-worker server such as gunicorn,
+consecutive scrapes land on different workers and their counters appear to
+jump; scrape every worker process separately (for example one worker per
+container behind the scrape target) and aggregate in Prometheus.
+"""
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Cumulative histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        """Record one observation for the given label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1), 0.0, 0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        """Return the histogram in Prometheus text format."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            series = {key: (counts[:], total, count)
+                      for key, (counts, total, count) in self._series.items()}
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = ','.join(
+                f'{name}="{value}"'
+                for name, value in zip(self.labels, label_values)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return '\n'.join(lines)
+
+
+class CallbackMetric:
+    """Gauge or counter whose values are read from a callback at scrape time.
+
+    ``read`` returns a mapping of label value tuples to numbers.
+    """
+
+    def __init__(self, name, documentation, metric_type, labels, read):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.labels = labels
+        self.read = read
+
+    def expose(self):
+        """Return the metric in Prometheus text format."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.metric_type}',
+        ]
+        for label_values, value in sorted(self.read().items()):
+            labels = ','.join(
+                f'{name}="{label}"'
+                for name, label in zip(self.labels, label_values)
+            )
+            lines.append(f'{self.name}{{{labels}}} {value}')
+        return '\n'.join(lines)
+
+
+class Registry:
+    """Collection of metrics served at /metrics."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """Return every metric in Prometheus text format."""
+        return '\n'.join(metric.expose() for metric in self.metrics) + '\n'
+
+
+registry = Registry()
+
+LABELS = ('view', 'method')
+request_duration = registry.register(Histogram(
+    'http_request_duration_seconds',
+    'Wall time spent handling a request.',
+    LABELS,
+    DURATION_BUCKETS,
+))
+db_queries = registry.register(Histogram(
+    'http_request_db_queries',
+    'SQL queries run while handling a request.',
+    LABELS,
+    COUNT_BUCKETS,
+))
+db_duration = registry.register(Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent in SQL while handling a request.',
+    LABELS,
+    DURATION_BUCKETS,
+))
+serialize_duration = registry.register(Histogram(
+    'http_request_serialize_duration_seconds',
+    'Time spent building the response data, including queries it runs.',
+    LABELS,
+    DURATION_BUCKETS,
+))
+render_duration = registry.register(Histogram(
+    'http_request_render_duration_seconds',
+    'Time spent rendering the response body.',
+    LABELS,
+    DURATION_BUCKETS,
+))
+response_bytes = registry.register(Histogram(
+    'http_response_bytes',
+    'Size of the response body.',
+    LABELS,
+    BYTES_BUCKETS,
+))
+pool_checkout_duration = registry.register(Histogram(
+    'db_pool_checkout_duration_seconds',
+    'Time spent checking a connection out of the pool.',
+    ('pool',),
+    DURATION_BUCKETS,
+))
+
+
+class RequestMetrics:
+    """Counters collected while one request is handled."""
+    __slots__ = (
+        'db_queries', 'db_time', 'serialize_time', 'serializing',
+        'render_time',
+    )
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+        self.render_time = 0.0
+
+
+current_request = contextvars.ContextVar(
+    'current_request_metrics', default=None,
+)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting queries of the current request."""
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+@contextlib.contextmanager
+def timed_serialization():
+    """Add the time spent in the block to the request's serialize time.
+
+    Nested blocks, such as a serializer used by another, count once.
+    """
+    metrics = current_request.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - started
+        metrics.serializing = False
+
+
+class TimedSerializerMixin:
+    """Serializer mixin recording the time ``data`` takes to build."""
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
@@ -0,0 +1,119 @@
+"""
+Middleware for the API.
+"""
+import asyncio
+import time
+
+from core import metrics, routers
+
+
+class PerformanceMiddleware:
+    """Record per-request timings as Server-Timing headers and histograms.
+
+    Collects wall time, SQL query count and time, serialization and render
+    time and response size. Works in both the WSGI and the ASGI handler chains.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        self.finish(request, response, request_metrics, started)
+        return response
+
+    async def __acall__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        self.finish(request, response, request_metrics, started)
+        return response
+
+    def finish(self, request, response, request_metrics, started):
+        """Attach the Server-Timing header and record the histograms."""
+        elapsed = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        labels = (match.view_name if match else 'unmatched', request.method)
+
+        metrics.request_duration.observe(labels, elapsed)
+        metrics.db_queries.observe(labels, request_metrics.db_queries)
+        metrics.db_duration.observe(labels, request_metrics.db_time)
+        metrics.serialize_duration.observe(
+            labels, request_metrics.serialize_time,
+        )
+        metrics.render_duration.observe(labels, request_metrics.render_time)
+        if not response.streaming:
+            metrics.response_bytes.observe(labels, len(response.content))
+
+        response['Server-Timing'] = ', '.join([
+            f'app;dur={elapsed * 1000:.2f}',
+            f'db;dur={request_metrics.db_time * 1000:.2f};'
+            f'desc="{request_metrics.db_queries} queries"',
+            f'serialize;dur={request_metrics.serialize_time * 1000:.2f}',
+            f'render;dur={request_metrics.render_time * 1000:.2f}',
+        ])
+
+
+class ReplicaRoutingMiddleware:
+    """Scope replica routing to one request and pin writers to the primary.
+
+    Successful unsafe requests by an authenticated user pin that user's
+    reads to the primary; ``ReplicaReadMixin`` opts safe requests into the
+    replicas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = routers.use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.use_replica.reset(token)
+        self.pin_writer(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = routers.use_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.use_replica.reset(token)
+        self.pin_writer(request, response)
+        return response
+
+    def pin_writer(self, request, response):
+        """Pin the user to the primary after a successful write."""
+        user = getattr(request, 'user', None)
+        if (
+            request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            routers.pin_to_primary(user.pk)
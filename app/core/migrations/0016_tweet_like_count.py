@@ -0,0 +1,31 @@
+# Generated by Django 4.0.10 on 2026-10-17 09:30
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_like_count(apps, schema_editor):
+    """Set like_count from the existing likes."""
+    Tweet = apps.get_model('core', 'Tweet')
+    Like = Tweet.likes.through
+    counts = Like.objects.filter(
+        tweet=OuterRef('pk'),
+    ).values('tweet').annotate(count=Count('*')).values('count')
+    Tweet.objects.update(like_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tweet',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_like_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.0.10 on 2026-10-17 11:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_tweet_like_count'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='tweet',
+            index=models.Index(fields=['user', '-id'], name='core_tweet_user_id_desc_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tweet',
+            index=models.Index(fields=['-created'], name='core_tweet_created_idx'),
+        ),
+        # The auto-created through tables only index each column on its
+        # own. Reverse lookups (followers of a user, tweets liked by a user)
+        # need the other column next to the filter to page by id.
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS core_user_follows_to_from_idx '
+            'ON core_user_follows (to_user_id, from_user_id);',
+            'DROP INDEX CONCURRENTLY IF EXISTS core_user_follows_to_from_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS core_tweet_likes_user_tweet_idx '
+            'ON core_tweet_likes (user_id, tweet_id);',
+            'DROP INDEX CONCURRENTLY IF EXISTS core_tweet_likes_user_tweet_idx;',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-17 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.0.10 on 2026-10-17 14:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0018_user_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tweet',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Keep search_vector in step with tweet_text for every write path,
+        # including queryset updates that bypass Model.save().
+        migrations.RunSQL(
+            "CREATE TRIGGER core_tweet_search_vector_update "
+            "BEFORE INSERT OR UPDATE OF tweet_text ON core_tweet "
+            "FOR EACH ROW EXECUTE FUNCTION "
+            "tsvector_update_trigger(search_vector, 'pg_catalog.english', tweet_text);",
+            'DROP TRIGGER IF EXISTS core_tweet_search_vector_update ON core_tweet;',
+        ),
+        migrations.RunSQL(
+            "UPDATE core_tweet SET search_vector = "
+            "to_tsvector('pg_catalog.english', tweet_text);",
+            migrations.RunSQL.noop,
+        ),
+        AddIndexConcurrently(
+            model_name='tweet',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'],
+                name='core_tweet_search_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.0.10 on 2026-10-17 15:00
+
+import datetime
+import itertools
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+from tweet.tags import extract
+from tweet.trending import bucket_start
+
+
+def backfill_tags(apps, schema_editor):
+    """Index the hashtags and mentions of the existing tweets.
+
+    Trending counts are only added for buckets the windows still cover.
+    """
+    Tweet = apps.get_model('core', 'Tweet')
+    Hashtag = apps.get_model('core', 'Hashtag')
+    Mention = apps.get_model('core', 'Mention')
+    HashtagCount = apps.get_model('core', 'HashtagCount')
+    since = bucket_start(timezone.now() - datetime.timedelta(
+        seconds=max(settings.TRENDING_WINDOWS.values()),
+    ))
+    counts = Counter()
+    rows = Tweet.objects.order_by('id').values_list(
+        'id', 'tweet_text', 'created',
+    ).iterator(chunk_size=2000)
+    while True:
+        batch = list(itertools.islice(rows, 2000))
+        if not batch:
+            break
+        hashtags, mentions = [], []
+        for tweet_id, text, created in batch:
+            names, handles = extract(text)
+            hashtags += [
+                Hashtag(tweet_id=tweet_id, name=name) for name in names
+            ]
+            mentions += [
+                Mention(tweet_id=tweet_id, handle=handle) for handle in handles
+            ]
+            bucket = bucket_start(created)
+            if bucket >= since:
+                counts.update((name, bucket) for name in names)
+        Hashtag.objects.bulk_create(hashtags)
+        Mention.objects.bulk_create(mentions)
+    HashtagCount.objects.bulk_create([
+        HashtagCount(name=name, bucket=bucket, count=count)
+        for (name, bucket), count in counts.items()
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_tweet_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('tweet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtags', to='core.tweet')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Mention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('handle', models.CharField(max_length=100)),
+                ('tweet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='core.tweet')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HashtagCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='hashtag',
+            constraint=models.UniqueConstraint(fields=('tweet', 'name'), name='unique_tweet_hashtag'),
+        ),
+        migrations.AddIndex(
+            model_name='hashtag',
+            index=models.Index(fields=['name', '-tweet'], name='core_hashtag_name_tweet_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='mention',
+            constraint=models.UniqueConstraint(fields=('tweet', 'handle'), name='unique_tweet_mention'),
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(fields=['handle', '-tweet'], name='core_mention_handle_tweet_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hashtagcount',
+            constraint=models.UniqueConstraint(fields=('name', 'bucket'), name='unique_hashtag_bucket'),
+        ),
+        migrations.AddIndex(
+            model_name='hashtagcount',
+            index=models.Index(fields=['bucket'], name='core_hashtagcount_bucket_idx'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.0.10 on 2026-10-17 15:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_hashtag_mention_hashtagcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularTweet',
+            fields=[
+                ('tweet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='core.tweet')),
+                ('score', models.FloatField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='populartweet',
+            index=models.Index(fields=['-score'], name='core_populartweet_score_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.10 on 2026-10-17 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            'UPDATE core_user u SET '
+            'follower_count = (SELECT COUNT(*) FROM core_user_follows WHERE to_user_id = u.id), '
+            'following_count = (SELECT COUNT(*) FROM core_user_follows WHERE from_user_id = u.id);',
+            migrations.RunSQL.noop,
+        ),
+    ]
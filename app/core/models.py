@@ -5,7 +5,12 @@ import uuid
 import os
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -13,6 +18,14 @@ from django.contrib.auth.models import (
 )
 
 
+def count_related(through, field):
+    """Return an expression counting rows of a through table per object."""
+    counts = through.objects.filter(
+        **{field: OuterRef('pk')},
+    ).order_by().values(field).annotate(count=Count('*')).values('count')
+    return Coalesce(Subquery(counts), 0)
+
+
 def user_image_file_path(instance, filename):
     """Generate file path for new recipe image."""
     ext = os.path.splitext(filename)[1]
@@ -21,7 +34,28 @@ def user_image_file_path(instance, filename):
     return os.path.join('uploads', 'user', filename)
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    """Queryset for users."""
+
+    def with_counts(self, *names):
+        """Return users annotated with their follow and like counts.
+
+        Follow counts come from the maintained ``follower_count`` and
+        ``following_count`` columns. Only the counts in ``names`` are
+        annotated when any are given.
+        """
+        counts = {
+            'follows_count': lambda: F('following_count'),
+            'followers_count': lambda: F('follower_count'),
+            'likes_count': lambda: count_related(Tweet.likes.through, 'user'),
+        }
+        return self.annotate(**{
+            name: count() for name, count in counts.items()
+            if not names or name in names
+        })
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Manager for users."""
 
     def create_user(self, email, password=None, **extra_fields):
@@ -43,17 +77,46 @@ class UserManager(BaseUserManager):
 
         return user
 
+
 class User(AbstractBaseUser, PermissionsMixin):
     """User in the system."""
     name = models.CharField(max_length=255)
     email = models.EmailField(max_length=255, unique=True)
     follows = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='followers', blank=True, symmetrical=False)
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
     image = models.ImageField(null=True, upload_to=user_image_file_path)
+    image_renditions = models.JSONField(default=dict, blank=True)
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
+    # Fields whose change must drop the user's cached tokens.
+    AUTH_FIELDS = ('password', 'is_active', 'is_staff', 'is_superuser')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_auth_state = instance.auth_state()
+        return instance
+
+    def auth_state(self):
+        """Return the loaded values of AUTH_FIELDS, None where deferred."""
+        return tuple(self.__dict__.get(name) for name in self.AUTH_FIELDS)
+
+
+class TweetQuerySet(models.QuerySet):
+    """Queryset for tweets."""
+
+    def with_liked_by(self, user):
+        """Annotate whether the given user liked each tweet."""
+        return self.annotate(liked_by_me=Exists(
+            Tweet.likes.through.objects.filter(
+                tweet=OuterRef('pk'),
+                user_id=user.id,
+            )
+        ))
 
 
 class Tweet(models.Model):
@@ -64,8 +127,177 @@ class Tweet(models.Model):
     )
     tweet_text = models.TextField(blank=False)
     likes = models.ManyToManyField(settings.AUTH_USER_MODEL, blank=True, related_name='likes')
+    like_count = models.PositiveIntegerField(default=0)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    # Maintained from tweet_text by a database trigger, see migration 0019.
+    search_vector = SearchVectorField(null=True, editable=False)
+    objects = TweetQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-id'],
+                name='core_tweet_user_id_desc_idx',
+            ),
+            models.Index(fields=['-created'], name='core_tweet_created_idx'),
+            GinIndex(fields=['search_vector'], name='core_tweet_search_idx'),
+        ]
 
     def __str__(self):
         return self.tweet_text
+
+    def save(self, *args, **kwargs):
+        # Hashtags and mentions are indexed by a post_save handler, which
+        # must commit or roll back with the tweet.
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class TimelineEntry(models.Model):
+    """Tweet pushed into a user's precomputed home timeline."""
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    tweet = models.ForeignKey(Tweet, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner', 'tweet'],
+                name='unique_timeline_entry',
+            ),
+        ]
+
+
+class Hashtag(models.Model):
+    """Hashtag used in a tweet, stored casefolded without the ``#``."""
+    tweet = models.ForeignKey(
+        Tweet,
+        on_delete=models.CASCADE,
+        related_name='hashtags',
+    )
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tweet', 'name'],
+                name='unique_tweet_hashtag',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['name', '-tweet'],
+                name='core_hashtag_name_tweet_idx',
+            ),
+        ]
+
+
+class Mention(models.Model):
+    """Handle mentioned in a tweet, stored casefolded without the ``@``."""
+    tweet = models.ForeignKey(
+        Tweet,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+    )
+    handle = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tweet', 'handle'],
+                name='unique_tweet_mention',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['handle', '-tweet'],
+                name='core_mention_handle_tweet_idx',
+            ),
+        ]
+
+
+class HashtagCount(models.Model):
+    """Uses of a hashtag by tweets created in one time bucket."""
+    name = models.CharField(max_length=100)
+    bucket = models.DateTimeField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'bucket'],
+                name='unique_hashtag_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['bucket'],
+                name='core_hashtagcount_bucket_idx',
+            ),
+        ]
+
+
+class PopularTweet(models.Model):
+    """Recently liked tweet with its time-decayed popularity score."""
+    tweet = models.OneToOneField(
+        Tweet,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-score'],
+                name='core_populartweet_score_idx',
+            ),
+        ]
+
+
+class Job(models.Model):
+    """Background job waiting in or claimed from a queue, see core.jobs."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued'
+        RUNNING = 'running'
+        FAILED = 'failed'
+
+    queue = models.CharField(max_length=100, default='default')
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['queue', '-priority', 'run_at', 'id'],
+                name='core_job_claim_idx',
+                condition=models.Q(status='queued'),
+            ),
+            models.Index(
+                fields=['queue', 'locked_at'],
+                name='core_job_running_idx',
+                condition=models.Q(status='running'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
@@ -0,0 +1,213 @@
+"""
+Keyset pagination for list endpoints.
+"""
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(value):
+    """Return an opaque cursor for a key value."""
+    return b64encode(str(value).encode('ascii')).decode('ascii')
+
+
+def row_value(row, name):
+    """Return a field of a model instance or ``values()`` row."""
+    if isinstance(row, dict):
+        return row[name]
+    return getattr(row, name)
+
+
+def decode_cursor(cursor):
+    """Return the key value stored in an opaque cursor."""
+    try:
+        value = int(b64decode(cursor.encode('ascii'), validate=True))
+    except (TypeError, ValueError, UnicodeEncodeError):
+        raise NotFound(KeysetPagination.invalid_cursor_message)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """Paginate newest first with opaque before/after cursors on a key.
+
+    Pages are selected with ``WHERE key < cursor`` or ``key > cursor`` and
+    a ``LIMIT``, never with OFFSET or COUNT(*), so every page costs the
+    same regardless of its depth.
+    """
+    ordering = 'id'
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    before_query_param = 'before'
+    after_query_param = 'after'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def read_cursors(self, request):
+        """Read page size and cursors from the request."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.before = self.get_cursor(request, self.before_query_param)
+        self.after = self.get_cursor(request, self.after_query_param)
+
+    def get_page_size(self, request):
+        """Return the requested page size capped at the maximum."""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_cursor(self, request, param):
+        """Return the decoded cursor for a query parameter, if any."""
+        cursor = request.query_params.get(param)
+        if not cursor:
+            return None
+        return decode_cursor(cursor)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of the queryset, newest first."""
+        self.read_cursors(request)
+        key = self.ordering
+        if self.after is not None:
+            queryset = queryset.filter(**{f'{key}__gt': self.after})
+            rows = list(queryset.order_by(key)[:self.page_size + 1])[::-1]
+        else:
+            if self.before is not None:
+                queryset = queryset.filter(**{f'{key}__lt': self.before})
+            rows = list(queryset.order_by(f'-{key}')[:self.page_size + 1])
+        return self.paginate_rows(rows)
+
+    def paginate_rows(self, rows):
+        """Trim rows fetched one past the page size and record links.
+
+        ``rows`` must be newest first and hold up to ``page_size + 1``
+        items selected with the cursors from ``read_cursors``.
+        """
+        has_more = len(rows) > self.page_size
+        if self.after is not None:
+            self.page = rows[-self.page_size:]
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.page = rows[:self.page_size]
+            self.has_next = has_more
+            self.has_previous = self.before is not None
+        return self.page
+
+    def get_key(self, row):
+        """Return the key value of a row."""
+        return row_value(row, self.ordering)
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.after_query_param)
+        return replace_query_param(
+            url,
+            self.before_query_param,
+            encode_cursor(self.get_key(self.page[-1])),
+        )
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.before_query_param)
+        return replace_query_param(
+            url,
+            self.after_query_param,
+            encode_cursor(self.get_key(self.page[0])),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string', 'nullable': True, 'format': 'uri',
+                },
+                'previous': {
+                    'type': 'string', 'nullable': True, 'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': schema_type},
+            }
+            for param, schema_type in [
+                (self.before_query_param, 'string'),
+                (self.after_query_param, 'string'),
+                (self.page_size_query_param, 'integer'),
+            ]
+        ]
+
+
+class RankedKeysetPagination(KeysetPagination):
+    """Keyset pagination ordered by a score annotation, highest first.
+
+    Rows with equal scores are ordered by id, and cursors hold both values,
+    so ties are neither skipped nor repeated across pages.
+    """
+    rank = 'rank'
+
+    def get_cursor(self, request, param):
+        """Return the decoded (rank, key) cursor for a query parameter."""
+        cursor = request.query_params.get(param)
+        if not cursor:
+            return None
+        try:
+            value = b64decode(cursor.encode('ascii'), validate=True)
+            rank, key = value.split(b':')
+            return float(rank), int(key)
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of the queryset, highest rank first."""
+        self.read_cursors(request)
+        rank, key = self.rank, self.ordering
+        if self.after is not None:
+            after_rank, after_key = self.after
+            queryset = queryset.filter(
+                Q(**{f'{rank}__gt': after_rank})
+                | Q(**{rank: after_rank, f'{key}__gt': after_key})
+            )
+            queryset = queryset.order_by(rank, key)
+            rows = list(queryset[:self.page_size + 1])[::-1]
+        else:
+            if self.before is not None:
+                before_rank, before_key = self.before
+                queryset = queryset.filter(
+                    Q(**{f'{rank}__lt': before_rank})
+                    | Q(**{rank: before_rank, f'{key}__lt': before_key})
+                )
+            queryset = queryset.order_by(f'-{rank}', f'-{key}')
+            rows = list(queryset[:self.page_size + 1])
+        return self.paginate_rows(rows)
+
+    def get_key(self, row):
+        """Return the rank and key of a row as one cursor value."""
+        return f'{row_value(row, self.rank)!r}:{super().get_key(row)}'
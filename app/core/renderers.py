@@ -0,0 +1,22 @@
+"""
+Renderers for the API.
+"""
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from core import metrics
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSON renderer that records its time in the request metrics."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        request_metrics = metrics.current_request.get()
+        if request_metrics is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            request_metrics.render_time += time.perf_counter() - started
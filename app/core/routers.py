@@ -0,0 +1,75 @@
+"""
+Database routers.
+"""
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+
+use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def _sticky_key(user_id):
+    return f'db:primary:{user_id}'
+
+
+def _sticky_cache():
+    return caches[settings.REPLICA_STICKY_CACHE]
+
+
+def pin_to_primary(user_id):
+    """Send the user's reads to the primary for the sticky window.
+
+    The pin is kept in the ``REPLICA_STICKY_CACHE`` alias, which must be
+    shared by every process so the user's next request sees it wherever
+    it is served.
+    """
+    _sticky_cache().set(
+        _sticky_key(user_id), True, settings.REPLICA_STICKY_SECONDS,
+    )
+
+
+def is_pinned_to_primary(user_id):
+    """Return whether the user wrote within the sticky window."""
+    return _sticky_cache().get(_sticky_key(user_id), False)
+
+
+class ReplicaRouter:
+    """Route reads to a replica when the current request opted in.
+
+    Everything else, including all writes and migrations, uses the
+    primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if use_replica.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaReadMixin:
+    """Serve safe requests of an API view from a replica.
+
+    Users who wrote within ``REPLICA_STICKY_SECONDS`` keep reading from the
+    primary so they see their own writes. Views answering from version
+    tokens with ``conditional_on_versions`` read from the primary anyway,
+    so they do not use this mixin.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD', 'OPTIONS') and not (
+            request.user.is_authenticated
+            and is_pinned_to_primary(request.user.pk)
+        ):
+            use_replica.set(True)
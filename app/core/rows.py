@@ -0,0 +1,112 @@
+"""
+Read-only serializers for rows from ``QuerySet.values()``.
+
+List endpoints spend most of their CPU in model instantiation and the
+per-field machinery of ``ModelSerializer``. A ``RowSerializer`` instead
+selects only its columns with ``values()`` and builds each item with one
+dict comprehension, producing the same JSON as the model serializer it
+stands in for. The model serializers remain the ``serializer_class`` of
+their views for writes, validation and the API schema.
+"""
+from django.utils import timezone
+from rest_framework.response import Response
+
+from core.fields import FieldSelectionMixin
+from core.metrics import timed_serialization
+
+
+def iso_datetime(value):
+    """Format a datetime like DRF's ``DateTimeField`` with default settings."""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class RowSerializer:
+    """Serialize dict rows to the fields listed in ``fields``.
+
+    ``converters`` maps a field to a function applied to its value; other
+    values are passed through, so they must already be JSON-ready. With a
+    ``selection`` only the selected fields are output and selected.
+    """
+    fields = ()
+    converters = {}
+
+    def __init__(self, instance=None, many=False, context=None,
+                 selection=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.selection = selection
+        if selection is not None:
+            self.fields = tuple(
+                name for name in self.fields if selection.includes(name)
+            )
+
+    def columns(self):
+        """Return the ``values()`` columns the selected fields need."""
+        return self.fields
+
+    def values(self, queryset, *columns):
+        """Return rows of ``queryset`` with these and the extra ``columns``."""
+        return queryset.values(*dict.fromkeys([*self.columns(), *columns]))
+
+    def prepare(self, rows):
+        """Complete a batch of rows before they are represented."""
+
+    def to_representation(self, row):
+        converters = self.converters
+        return {
+            name: (
+                converters[name](row[name]) if name in converters
+                else row[name]
+            )
+            for name in self.fields
+        }
+
+    def represent(self, rows):
+        """Return the representation of a batch of rows."""
+        rows = list(rows)
+        with timed_serialization():
+            self.prepare(rows)
+            return [self.to_representation(row) for row in rows]
+
+    @property
+    def data(self):
+        if self.many:
+            return self.represent(self.instance)
+        return self.represent([self.instance])[0]
+
+
+class RowListMixin(FieldSelectionMixin):
+    """Serve ``list`` from ``values()`` rows with ``row_serializer_class``.
+
+    ``row_columns`` names columns the paginator needs, such as the cursor
+    key and a ranking annotation, that are selected even when not output.
+    """
+    row_serializer_class = None
+    row_columns = ('id',)
+
+    def get_row_serializer(self, *args, **kwargs):
+        """Return a row serializer for the request's field selection."""
+        kwargs['selection'] = self.get_field_selection()
+        return self.row_serializer_class(*args, **kwargs)
+
+    def get_row_queryset(self):
+        """Return the filtered queryset as rows of the serialized columns."""
+        return self.get_row_serializer().values(
+            self.filter_queryset(self.get_queryset()),
+            *self.row_columns,
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_row_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.get_row_serializer(queryset, many=True).data)
+        return self.get_paginated_response(
+            self.get_row_serializer(page, many=True).data,
+        )
@@ -0,0 +1,106 @@
+"""
+Signal handlers for core models.
+"""
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core import metrics
+from core.authentication import invalidate_token
+from core.models import Tweet
+from tweet import tags
+from user import follows, profiles
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Drop a deleted token from the authentication cache."""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, update_fields,
+                           **kwargs):
+    """Drop cached tokens of a saved user whose AUTH_FIELDS changed.
+
+    A new password or deactivation is seen on the next request. Saves of
+    other fields skip the token lookup.
+    """
+    auth_fields = set(sender.AUTH_FIELDS)
+    if update_fields is not None and not auth_fields & set(update_fields):
+        return
+    state = instance.auth_state()
+    loaded = getattr(instance, '_loaded_auth_state', None)
+    instance._loaded_auth_state = state
+    if created or loaded == state:
+        return
+    keys = Token.objects.filter(user=instance).values_list('key', flat=True)
+    for key in keys:
+        invalidate_token(key)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Count queries of each new connection in the request metrics."""
+    if metrics.record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.record_query)
+
+
+@receiver(m2m_changed, sender=get_user_model().follows.through)
+def recount_changed_follows(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    """Recount follow counts after follows are edited through the ORM.
+
+    This covers edits such as those in the admin. API follow writes bypass
+    the ORM and move the counts themselves.
+    """
+    if action == 'pre_clear':
+        # clear() reports no ids, so remember the other ends beforehand.
+        related = instance.followers if reverse else instance.follows
+        instance._cleared_follow_ids = list(
+            related.values_list('id', flat=True),
+        )
+    elif action == 'post_clear':
+        cleared_ids = instance.__dict__.pop('_cleared_follow_ids', [])
+        user_ids = [instance.pk, *cleared_ids]
+        follows.recount_users(user_ids)
+        profiles.invalidate_profiles(user_ids)
+    elif action in ('post_add', 'post_remove') and pk_set:
+        user_ids = [instance.pk, *pk_set]
+        follows.recount_users(user_ids)
+        profiles.invalidate_profiles(user_ids)
+
+
+@receiver(pre_delete, sender=get_user_model())
+def detach_deleted_user(sender, instance, **kwargs):
+    """Move the follow counts of the accounts linked to a deleted user.
+
+    Those are the accounts it followed or was followed by, whose follow
+    rows the cascade deletes without counting them.
+    """
+    user_ids = follows.detach_user(instance.pk)
+    if user_ids:
+        profiles.invalidate_profiles(user_ids)
+
+
+@receiver(post_save, sender=Tweet)
+def index_saved_tweet(sender, instance, created, update_fields, **kwargs):
+    """Index the hashtags and mentions of a tweet saved with its text."""
+    if update_fields is None or 'tweet_text' in update_fields:
+        tags.index_tweet(instance, created=created)
+
+
+@receiver(pre_delete, sender=Tweet)
+def unindex_deleted_tweet(sender, instance, **kwargs):
+    """Remove a deleted tweet's hashtags from the trending counts.
+
+    This runs before the cascade deletes the tweet's Hashtag rows.
+    """
+    tags.unindex_tweet(instance)
@@ -0,0 +1,58 @@
+"""
+Streaming JSON responses for unpaginated list endpoints.
+
+A streamed list reads its queryset through a server-side cursor with
+``iterator(chunk_size=STREAM_CHUNK_SIZE)`` and encodes it as a JSON array
+one chunk of rows at a time, so the memory a request holds is bounded by
+the chunk size rather than the number of rows, and the first rows are sent
+before the last ones are read.
+"""
+import itertools
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_QUERY_PARAM = 'stream'
+
+
+def wants_stream(request):
+    """Return whether the request asked for a streamed, unpaginated list."""
+    value = request.query_params.get(STREAM_QUERY_PARAM, '')
+    return value.lower() in ('1', 'true')
+
+
+def json_array(items, chunk_size):
+    """Yield the JSON array of ``items`` in pieces of ``chunk_size`` items."""
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    chunk = []
+    separator = '['
+    for item in items:
+        chunk.append(separator)
+        chunk.append(encoder.encode(item))
+        separator = ','
+        if len(chunk) >= 2 * chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append('[]' if separator == '[' else ']')
+    yield ''.join(chunk)
+
+
+def stream_list(queryset, serializer, chunk_size=None):
+    """Return a response streaming ``queryset`` as a JSON array.
+
+    ``serializer`` is an unbound ``RowSerializer`` that represents the
+    rows one chunk at a time. The queryset is pinned to the database
+    chosen now, since it is read after the view has returned.
+    """
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    rows = queryset.using(queryset.db).iterator(chunk_size=chunk_size)
+    items = (
+        item
+        for chunk in iter(lambda: list(itertools.islice(rows, chunk_size)), [])
+        for item in serializer.represent(chunk)
+    )
+    return StreamingHttpResponse(
+        json_array(items, chunk_size),
+        content_type='application/json',
+    )
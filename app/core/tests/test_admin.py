@@ -14,14 +14,13 @@ class AdminSiteTests(TestCase):
         self.client = Client()
         self.admin_user = get_user_model().objects.create_superuser(
             email='admin@example.com',
-            username='Admin',
             password='testpass123',
         )
         self.client.force_login(self.admin_user)
         self.user = get_user_model().objects.create_user(
             email='user@example.com',
             password='testpass123',
-            username='Test User',
+            name='Test User',
         )
 
     def test_users_list(self):
@@ -29,7 +28,7 @@ class AdminSiteTests(TestCase):
         url = reverse('admin:core_user_changelist')
         res = self.client.get(url)
 
-        self.assertContains(res, self.user.username)
+        self.assertContains(res, self.user.name)
         self.assertContains(res, self.user.email)
 
     def test_edit_user_page(self):
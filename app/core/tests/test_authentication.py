@@ -0,0 +1,95 @@
+"""
+Tests for the cached token authentication backend.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.authentication import (
+    CachedTokenAuthentication,
+    shared_cache_key,
+    token_cache,
+)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test cached token authentication."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_warm_lookup_runs_no_queries(self):
+        """Test a cached token authenticates without querying."""
+        self.auth.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_deleted_token_is_invalidated(self):
+        """Test deleting a token drops it from the cache."""
+        self.auth.authenticate_credentials(self.token.key)
+
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_deactivated_user_is_invalidated(self):
+        """Test deactivating a user drops their token from the cache."""
+        self.auth.authenticate_credentials(self.token.key)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_password_change_is_invalidated(self):
+        """Test changing the password refreshes the cached user."""
+        self.auth.authenticate_credentials(self.token.key)
+
+        self.user.set_password('newpass123')
+        self.user.save()
+        user, _ = self.auth.authenticate_credentials(self.token.key)
+
+        self.assertTrue(user.check_password('newpass123'))
+
+    def test_unrelated_save_skips_token_lookup(self):
+        """Test saving fields authentication ignores queries no tokens."""
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.name = 'New Name'
+
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_shared_tier_caches_no_password(self):
+        """Test the shared tier stores only the permission fields."""
+        shared = LocMemCache('shared', {})
+        with mock.patch(
+            'core.authentication.get_shared_cache',
+            return_value=shared,
+        ):
+            self.auth.authenticate_credentials(self.token.key)
+            token_cache.clear()
+            with self.assertNumQueries(0):
+                user, token = self.auth.authenticate_credentials(
+                    self.token.key,
+                )
+
+        cached = shared.get(shared_cache_key(self.token.key))
+        self.assertEqual(cached, (self.user.pk, True, False, False))
+        self.assertEqual(token.key, self.token.key)
+        self.assertEqual(user.email, 'test@example.com')
@@ -0,0 +1,46 @@
+"""
+Tests for the deployment system checks.
+"""
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_shared_cache
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    """Test the default cache must be shared between processes."""
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_process_local_cache_rejected(self):
+        """Test a per-process default cache is an error."""
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/0',
+    }})
+    def test_shared_cache_accepted(self):
+        """Test a shared default cache passes."""
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                'LOCATION': 'redis://localhost:6379/0',
+            },
+            'local': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        },
+        REPLICA_STICKY_CACHE='local',
+    )
+    def test_process_local_sticky_cache_rejected(self):
+        """Test replica pins cannot be kept in a per-process cache."""
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+        self.assertIn("'local'", errors[0].msg)
@@ -1,13 +1,20 @@
 """
 Test custom Django management commands.
 """
+import json
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+
+from core.management.commands.audit_query_plans import find_problems
+from core.models import Tweet
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -29,3 +36,160 @@ class CommandTests(SimpleTestCase):
         call_command('wait_for_db')
         self.assertEqual(patched_check.call_count, 7)
         patched_check.assert_called_with(databases=["default"])
+
+
+class SeedAndBenchCommandTests(TestCase):
+    """Test the seeding and benchmark commands."""
+
+    def test_seed_social_graph(self):
+        """Test seeding creates users, follows, tweets and likes."""
+        call_command(
+            'seed_social_graph',
+            users=20,
+            tweets=50,
+            follows_per_user=5,
+            likes=100,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(get_user_model().objects.count(), 20)
+        self.assertEqual(Tweet.objects.count(), 50)
+        self.assertTrue(get_user_model().follows.through.objects.exists())
+        for user in get_user_model().objects.all():
+            self.assertEqual(user.follower_count, user.followers.count())
+        for tweet in Tweet.objects.all():
+            self.assertEqual(tweet.like_count, tweet.likes.count())
+
+    def test_bench_api_writes_results(self):
+        """Test the benchmark reports every endpoint."""
+        call_command(
+            'seed_social_graph',
+            users=5,
+            tweets=10,
+            likes=10,
+            stdout=StringIO(),
+        )
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'bench_api',
+                iterations=2,
+                output=output.name,
+                stdout=StringIO(),
+            )
+            results = json.load(output)
+
+        self.assertIn('timeline', results['endpoints'])
+        self.assertIn('p99_ms', results['endpoints']['me'])
+
+    def test_bench_serializers_matches_model_serializers(self):
+        """Test the serializer benchmark checks and reports every case."""
+        call_command(
+            'seed_social_graph',
+            users=5,
+            tweets=10,
+            likes=10,
+            stdout=StringIO(),
+        )
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'bench_serializers',
+                rows=10,
+                repeat=2,
+                output=output.name,
+                stdout=StringIO(),
+            )
+            results = json.load(output)
+
+        self.assertEqual(
+            set(results['cases']),
+            {'tweets', 'users', 'liked-tweets'},
+        )
+        self.assertEqual(results['cases']['tweets']['rows'], 10)
+
+    def test_reconcile_follow_counts(self):
+        """Test drifted follow counts are repaired in chunks."""
+        call_command(
+            'seed_social_graph',
+            users=10,
+            tweets=10,
+            likes=10,
+            stdout=StringIO(),
+        )
+        User = get_user_model()
+        User.objects.update(follower_count=999, following_count=999)
+        out = StringIO()
+
+        call_command('reconcile_follow_counts', chunk_size=3, stdout=out)
+
+        self.assertIn('Repaired 10 users.', out.getvalue())
+        for user in User.objects.all():
+            self.assertEqual(user.follower_count, user.followers.count())
+            self.assertEqual(user.following_count, user.follows.count())
+
+    def test_audit_query_plans_on_small_graph(self):
+        """Test the plan audit explains every query and passes."""
+        call_command(
+            'seed_social_graph',
+            users=10,
+            tweets=20,
+            likes=20,
+            stdout=StringIO(),
+        )
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'audit_query_plans',
+                output=output.name,
+                stdout=StringIO(),
+            )
+            plans = json.load(output)
+
+        self.assertIn('followers', plans)
+        self.assertIn('Execution Time', plans['liked-tweets'])
+
+
+class FindProblemsTests(SimpleTestCase):
+    """Test flagging of query plan nodes."""
+
+    def test_flags_large_seq_scan_and_sort(self):
+        """Test big sequential scans and sorts are reported."""
+        plan = {'Plan': {
+            'Node Type': 'Sort',
+            'Actual Rows': 20,
+            'Plans': [{
+                'Node Type': 'Seq Scan',
+                'Relation Name': 'core_tweet',
+                'Actual Rows': 5000,
+                'Rows Removed by Filter': 95000,
+                'Actual Loops': 1,
+            }],
+        }}
+
+        problems = find_problems(
+            plan,
+            max_seq_scan_rows=1000,
+            max_sort_rows=1000,
+        )
+
+        self.assertEqual(problems, [
+            'Sort over 100000 rows',
+            'Seq Scan on core_tweet read 100000 rows',
+        ])
+
+    def test_ignores_small_scans(self):
+        """Test scans of small tables and index scans pass."""
+        plan = {'Plan': {
+            'Node Type': 'Nested Loop',
+            'Plans': [
+                {
+                    'Node Type': 'Seq Scan',
+                    'Relation Name': 'core_user',
+                    'Actual Rows': 10,
+                },
+                {'Node Type': 'Index Scan', 'Actual Rows': 100000},
+            ],
+        }}
+
+        self.assertEqual(find_problems(plan, 1000, 1000), [])
@@ -0,0 +1,125 @@
+"""
+Tests for the background job queue.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+
+CALLS = []
+
+
+def record(value):
+    """Job that records its argument."""
+    CALLS.append(value)
+
+
+def explode():
+    """Job that always fails."""
+    raise ValueError('boom')
+
+
+class JobTests(TestCase):
+    """Test queueing and running jobs."""
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_run_pending_runs_and_deletes_job(self):
+        """Test a queued job runs with its payload and is then removed."""
+        jobs.enqueue(record, value='hello')
+
+        count = jobs.run_pending()
+
+        self.assertEqual(count, 1)
+        self.assertEqual(CALLS, ['hello'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_priority_order(self):
+        """Test higher priority jobs of a queue run first."""
+        jobs.enqueue(record, value='low')
+        jobs.enqueue(record, priority=10, value='high')
+
+        jobs.run_pending(['default'])
+
+        self.assertEqual(CALLS, ['high', 'low'])
+
+    def test_delayed_job_not_run(self):
+        """Test a job is not run before its delay has passed."""
+        jobs.enqueue(record, delay=60, value='later')
+
+        self.assertEqual(jobs.run_pending(), 0)
+        self.assertEqual(CALLS, [])
+
+    def test_failed_job_retried_then_failed(self):
+        """Test a failing job is retried with backoff until max attempts."""
+        job = jobs.enqueue(explode, max_attempts=2)
+
+        jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('boom', job.last_error)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(JOBS={**settings.JOBS, 'QUEUES': {'limited': 1}})
+    def test_queue_concurrency_limit(self):
+        """Test a limited queue is not claimed while at its limit."""
+        jobs.enqueue(record, queue='limited', value='first')
+        jobs.enqueue(record, queue='limited', value='second')
+
+        self.assertIsNotNone(jobs.claim('limited', 'worker-1'))
+        self.assertIsNone(jobs.claim('limited', 'worker-2'))
+
+    def test_release_stale(self):
+        """Test jobs held past the lock timeout are requeued."""
+        job = jobs.enqueue(record, value='stale')
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.RUNNING,
+            attempts=1,
+            locked_by='gone',
+            locked_at=timezone.now() - timedelta(days=1),
+        )
+
+        self.assertEqual(jobs.release_stale(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(job.locked_by, '')
+
+    def test_heartbeat_keeps_job_claimed(self):
+        """Test a running job with a recent heartbeat is not released."""
+        job = jobs.enqueue(record, value='slow')
+        self.assertEqual(jobs.claim('default', 'worker-1')[0], job.id)
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(days=1),
+        )
+
+        self.assertTrue(jobs.Heartbeat(job.id, 'worker-1').beat())
+
+        self.assertEqual(jobs.release_stale(), 0)
+        self.assertFalse(jobs.Heartbeat(job.id, 'worker-2').beat())
+
+    def test_run_jobs_burst(self):
+        """Test the run_jobs command drains queues in burst mode."""
+        jobs.enqueue(record, value='burst')
+        out = StringIO()
+
+        call_command('run_jobs', '--burst', stdout=out, stderr=StringIO())
+
+        self.assertEqual(CALLS, ['burst'])
+        self.assertIn('Ran 1 jobs.', out.getvalue())
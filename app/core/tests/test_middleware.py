@@ -0,0 +1,60 @@
+"""
+Tests for the performance middleware and metrics endpoint.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Tweet
+
+METRICS_URL = reverse('metrics')
+TWEETS_URL = reverse('tweet:tweet-list')
+
+
+class PerformanceMiddlewareTests(TestCase):
+    """Test request instrumentation."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        Tweet.objects.create(user=self.user, tweet_text='test tweet')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        """Test responses carry app, db, serialize and render timings."""
+        res = self.client.get(TWEETS_URL)
+
+        timing = res['Server-Timing']
+        self.assertIn('app;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('render;dur=', timing)
+
+    def test_serialization_timed(self):
+        """Test building the response data is recorded apart from rendering."""
+        res = self.client.get(TWEETS_URL)
+
+        duration = re.search(r'serialize;dur=([\d.]+)', res['Server-Timing'])
+        self.assertGreater(float(duration.group(1)), 0)
+
+    def test_metrics_endpoint(self):
+        """Test the metrics endpoint exposes request histograms."""
+        self.client.get(TWEETS_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        body = res.content.decode()
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn(
+            'http_request_db_queries_count'
+            '{view="tweet:tweet-list",method="GET"}',
+            body,
+        )
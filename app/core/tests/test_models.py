@@ -12,11 +12,11 @@ class ModelTests(TestCase):
 
     def test_create_user_with_email_successful(self):
         """Test creating a user with an email is successful."""
-        username = 'user123'
+        name = 'user123'
         email = 'test@example.com'
         password = 'testpass123'
         user = get_user_model().objects.create_user(
-            username = username,
+            name = name,
             email = email,
             password = password,
         )
@@ -33,19 +33,19 @@ class ModelTests(TestCase):
             ['test4@example.COM', 'test4@example.com'],
         ]
         for i, (email, expected) in enumerate(sample_emails, 0):
-            username = f'user{i}'
-            user = get_user_model().objects.create_user(username, email, 'pw123')
+            user = get_user_model().objects.create_user(
+                email, 'pw123', name=f'user{i}',
+            )
             self.assertEqual(user.email, expected)
 
     def test_new_user_without_email_raises_error(self):
         """Test that creating a user without an email raises a ValueError."""
         with self.assertRaises(ValueError):
-            get_user_model().objects.create_user('user123', '', 'test123')
+            get_user_model().objects.create_user('', 'test123')
 
     def test_create_superuser(self):
         """Test creating a superuser."""
         user = get_user_model().objects.create_superuser(
-            'superuser123',
             'test@example.com',
             'test123',
         )
@@ -56,7 +56,7 @@ class ModelTests(TestCase):
     def test_create_tweet(self):
         """Test creating a tweet is successful."""
         user = get_user_model().objects.create_user(
-            username = 'username123',
+            name = 'username123',
             email = 'test@example.com',
             password = 'testpass123',
         )
@@ -0,0 +1,130 @@
+"""
+Tests for the database connection pool.
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+from psycopg2.extensions import (
+    TRANSACTION_STATUS_IDLE,
+    TRANSACTION_STATUS_INERROR,
+)
+
+from core import metrics
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Stand-in for a psycopg2 connection."""
+
+    def __init__(self):
+        self.closed = False
+        self.status = TRANSACTION_STATUS_IDLE
+        self.rolled_back = False
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rolled_back = True
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+def create_pool(**options):
+    """Create a pool of fake connections."""
+    defaults = {
+        'max_size': 2,
+        'max_lifetime': 60,
+        'timeout': 0.01,
+        'check_idle': 60,
+    }
+    defaults.update(options)
+    return ConnectionPool('test', FakeConnection, **defaults)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test checkout, return and discard behaviour."""
+
+    def test_reuses_returned_connection(self):
+        """Test a returned connection is handed out again."""
+        pool = create_pool()
+        conn = pool.getconn()
+        pool.putconn(conn)
+
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(pool.stats()['opened'], 1)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_timeout_when_exhausted(self):
+        """Test checkout waits and then fails when the pool is full."""
+        pool = create_pool()
+        pool.getconn()
+        pool.getconn()
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+
+        stats = pool.stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['waits'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+
+    def test_rolls_back_open_transaction(self):
+        """Test a connection returned mid-transaction is rolled back."""
+        pool = create_pool()
+        conn = pool.getconn()
+        conn.status = TRANSACTION_STATUS_INERROR
+        pool.putconn(conn)
+
+        self.assertTrue(conn.rolled_back)
+        self.assertIs(pool.getconn(), conn)
+
+    def test_discards_closed_connection(self):
+        """Test a connection closed by the server is replaced."""
+        pool = create_pool()
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.closed = True
+
+        new_conn = pool.getconn()
+
+        self.assertIsNot(new_conn, conn)
+        self.assertEqual(pool.stats()['discarded'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_discards_expired_connection(self):
+        """Test connections past their max lifetime are closed."""
+        pool = create_pool(max_lifetime=10)
+        with mock.patch('core.db.pool.time.monotonic', return_value=100):
+            conn = pool.getconn()
+        with mock.patch('core.db.pool.time.monotonic', return_value=111):
+            pool.putconn(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    def test_failed_connect_frees_slot(self):
+        """Test a failed connect does not leak pool capacity."""
+        pool = create_pool(max_size=1)
+        pool.connect = mock.Mock(side_effect=OSError)
+
+        with self.assertRaises(OSError):
+            pool.getconn()
+
+        self.assertEqual(pool.stats()['size'], 0)
+        self.assertEqual(pool.stats()['in_use'], 0)
+
+    def test_checkout_metrics(self):
+        """Test checkout latency and pool gauges are exported."""
+        pool = create_pool()
+        with mock.patch.dict('core.db.pool.pools', {'test': pool}):
+            pool.getconn()
+            output = metrics.registry.expose()
+
+        self.assertIn('db_pool_connections_in_use{pool="test"} 1', output)
+        self.assertIn(
+            'db_pool_checkout_duration_seconds_count{pool="test"}',
+            output,
+        )
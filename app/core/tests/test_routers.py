@@ -0,0 +1,61 @@
+"""
+Tests for read replica routing.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+TWEETS_URL = reverse('tweet:tweet-list')
+FOLLOWINGS_URL = reverse('user:followings')
+ME_URL = reverse('user:me')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """Test reads are routed to the replica alias."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def replica_queries(self, url):
+        """Return the number of queries a GET runs on the replica."""
+        with CaptureQueriesContext(connections['replica']) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_reads_use_replica(self):
+        """Test list reads run on the replica."""
+        self.assertGreater(self.replica_queries(FOLLOWINGS_URL), 0)
+
+    def test_versioned_reads_use_primary(self):
+        """Test reads cached or stamped under versions use the primary."""
+        self.assertEqual(self.replica_queries(TWEETS_URL), 0)
+        self.assertEqual(self.replica_queries(ME_URL), 0)
+
+    def test_reads_after_write_use_primary(self):
+        """Test a user's reads stick to the primary after a write."""
+        self.client.post(TWEETS_URL, {'tweet_text': 'new tweet'})
+
+        self.assertEqual(self.replica_queries(FOLLOWINGS_URL), 0)
+
+    def test_other_users_still_use_replica(self):
+        """Test stickiness only applies to the user who wrote."""
+        self.client.post(TWEETS_URL, {'tweet_text': 'new tweet'})
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(other)
+
+        self.assertGreater(self.replica_queries(FOLLOWINGS_URL), 0)
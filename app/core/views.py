@@ -0,0 +1,14 @@
+"""
+Views for operational endpoints.
+"""
+from django.http import HttpResponse
+
+from core import metrics
+
+
+def metrics_view(request):
+    """Serve the request metrics in Prometheus text format."""
+    return HttpResponse(
+        metrics.registry.expose(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
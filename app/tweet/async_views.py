@@ -0,0 +1,49 @@
+"""
+Async views for the high-concurrency tweet endpoints.
+
+Django 4.0 has no async ORM, so each view runs its database work as a
+single ``database_sync_to_async`` call and keeps the event loop free
+otherwise. The timeline accepts ``?fields=`` like its sync twin; neither
+sends ETags, since a timeline has no version token to derive them from.
+
+The FollowViewSet and TweetViewSet reads are not ported. They are answered
+with 304s from version tokens, sparse fields and replica routing in DRF's
+sync view machinery, and an async wrapper would have to run all of that in
+one thread hop, which is what the ASGI handler already does for them.
+"""
+from django.shortcuts import get_object_or_404
+
+from core.async_api import async_api_view, json_response
+from core.db.sync import database_sync_to_async
+from core.models import Tweet
+from tweet import likes, views
+
+
+def _like(user, tweet_id):
+    """Like a tweet, raising Http404 if it does not exist."""
+    if not likes.add_likes(user, [tweet_id]):
+        get_object_or_404(Tweet.objects.only('id'), id=tweet_id)
+
+
+def _unlike(user, tweet_id):
+    """Remove a like, raising Http404 if the tweet does not exist."""
+    if not likes.remove_likes(user, [tweet_id]):
+        get_object_or_404(Tweet.objects.only('id'), id=tweet_id)
+
+
+@async_api_view(['POST', 'DELETE'])
+async def like(request, tweet_id):
+    """Like or remove a like from a tweet."""
+    if request.method == 'POST':
+        await database_sync_to_async(_like)(request.user, tweet_id)
+        return json_response({'message': 'Tweet liked.'})
+
+    await database_sync_to_async(_unlike)(request.user, tweet_id)
+    return json_response({'message': 'Like is removed.'})
+
+
+@async_api_view(['GET'])
+async def home_timeline(request):
+    """List tweets from the user and the accounts they follow."""
+    response = await database_sync_to_async(views.timeline_page)(request)
+    return json_response(response.data)
@@ -0,0 +1,109 @@
+"""
+Like writes that keep Tweet.like_count in step with the likes table.
+"""
+from django.db import connection, transaction
+
+from core.models import Tweet
+from tweet import popular, versions
+from user import profiles
+
+Like = Tweet.likes.through
+
+
+def _tables():
+    """Return quoted names used by the like statements."""
+    quote = connection.ops.quote_name
+    return {
+        'likes': quote(Like._meta.db_table),
+        'tweets': quote(Tweet._meta.db_table),
+        'tweet_id': quote(Like._meta.get_field('tweet').column),
+        'user_id': quote(Like._meta.get_field('user').column),
+    }
+
+
+def _update_like_count(tweet_ids, delta):
+    """Add ``delta`` to the like_count of tweets.
+
+    The new counts rescore the tweets' popularity, and their authors'
+    tweet versions are bumped.
+    """
+    if not tweet_ids:
+        return
+    sql = (
+        'UPDATE {tweets} SET like_count = like_count + %s '
+        'WHERE id = ANY(%s) RETURNING id, user_id, like_count, created'
+    ).format(**_tables())
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [delta, list(tweet_ids)])
+        rows = cursor.fetchall()
+    popular.update_scores([
+        (tweet_id, like_count, created)
+        for tweet_id, _, like_count, created in rows
+    ])
+    versions.invalidate_tweets({user_id for _, user_id, _, _ in rows})
+
+
+def add_likes(user, tweet_ids):
+    """Like tweets and return the ids of the likes actually inserted.
+
+    One INSERT ... SELECT ... ON CONFLICT DO NOTHING skips missing tweets
+    and existing likes, and its RETURNING clause tells which counters to
+    bump.
+    """
+    sql = (
+        'INSERT INTO {likes} ({tweet_id}, {user_id}) '
+        'SELECT id, %s FROM {tweets} WHERE id = ANY(%s) '
+        'ON CONFLICT DO NOTHING RETURNING {tweet_id}'
+    ).format(**_tables())
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.id, list(tweet_ids)])
+            liked = {row[0] for row in cursor.fetchall()}
+        _update_like_count(liked, 1)
+        if liked:
+            profiles.invalidate_profiles([user.id])
+
+    return liked
+
+
+def remove_likes(user, tweet_ids):
+    """Remove likes and return the ids of the likes actually deleted."""
+    sql = (
+        'DELETE FROM {likes} WHERE {user_id} = %s AND {tweet_id} = ANY(%s) '
+        'RETURNING {tweet_id}'
+    ).format(**_tables())
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.id, list(tweet_ids)])
+            unliked = {row[0] for row in cursor.fetchall()}
+        _update_like_count(unliked, -1)
+        if unliked:
+            profiles.invalidate_profiles([user.id])
+
+    return unliked
+
+
+def like_results(tweet_ids, changed, status):
+    """Return a per-id result list for a batch of like changes.
+
+    Ids that did not change are checked for existence in one query to
+    tell unchanged likes from missing tweets.
+    """
+    unchanged = set(tweet_ids) - changed
+    existing = set()
+    if unchanged:
+        existing = set(
+            Tweet.objects.filter(id__in=unchanged).values_list('id', flat=True)
+        )
+
+    results = []
+    for tweet_id in dict.fromkeys(tweet_ids):
+        if tweet_id in changed:
+            result = status
+        elif tweet_id in existing:
+            result = 'unchanged'
+        else:
+            result = 'not_found'
+        results.append({'id': tweet_id, 'status': result})
+
+    return results
@@ -0,0 +1,103 @@
+"""
+Popular tweets ranked by time-decayed likes.
+
+A tweet's weight is ``likes * 2 ** (-age / half_life)``. With exponential
+decay every weight shrinks by the same factor as time passes, so the order
+of two tweets only changes when their likes do. Each tweet is therefore
+ranked by the time-independent score
+
+    log2(likes) + created / half_life
+
+which is written on like events for tweets younger than
+``POPULAR_MAX_AGE_HOURS`` and never recomputed in bulk. A periodic
+``refresh_popular_tweets`` run prunes aged-out candidates and caches the
+top K ids, so a read fetches at most K tweets by primary key.
+"""
+import datetime
+import math
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import cache
+from core.models import PopularTweet, Tweet
+
+TOP_KEY = 'popular:top'
+
+
+def score(like_count, created):
+    """Return the ranking score of a tweet."""
+    half_life = settings.POPULAR_HALF_LIFE_HOURS * 3600
+    return math.log2(like_count) + created.timestamp() / half_life
+
+
+def cutoff():
+    """Return the creation time before which tweets are not ranked."""
+    return timezone.now() - datetime.timedelta(
+        hours=settings.POPULAR_MAX_AGE_HOURS,
+    )
+
+
+def update_scores(rows):
+    """Rescore tweets whose likes changed.
+
+    ``rows`` yields ``(id, like_count, created)`` for each tweet.
+    """
+    since = cutoff()
+    scored = {
+        tweet_id: score(like_count, created)
+        for tweet_id, like_count, created in rows
+        if like_count > 0 and created >= since
+    }
+    unliked = [tweet_id for tweet_id, like_count, _ in rows if like_count <= 0]
+    if unliked:
+        PopularTweet.objects.filter(tweet_id__in=unliked).delete()
+    if not scored:
+        return
+    table = connection.ops.quote_name(PopularTweet._meta.db_table)
+    sql = (
+        f'INSERT INTO {table} (tweet_id, score) '
+        'SELECT * FROM unnest(%s::bigint[], %s::double precision[]) '
+        'ON CONFLICT (tweet_id) DO UPDATE SET score = EXCLUDED.score'
+    )
+    tweet_ids = sorted(scored)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [
+            tweet_ids,
+            [scored[tweet_id] for tweet_id in tweet_ids],
+        ])
+
+
+def rebuild_scores():
+    """Score every recent liked tweet from scratch and return how many."""
+    rows = list(Tweet.objects.filter(
+        created__gte=cutoff(),
+        like_count__gt=0,
+    ).values_list('id', 'like_count', 'created'))
+    with transaction.atomic():
+        PopularTweet.objects.all().delete()
+        update_scores(rows)
+    return len(rows)
+
+
+def _top_ids():
+    return list(PopularTweet.objects.order_by('-score').values_list(
+        'tweet_id', flat=True,
+    )[:settings.POPULAR_TOP_K])
+
+
+def refresh_top():
+    """Drop aged-out candidates and cache the current top K ids."""
+    PopularTweet.objects.filter(tweet__created__lt=cutoff()).delete()
+    top = _top_ids()
+    default_cache.set(TOP_KEY, top, settings.POPULAR_CACHE_TIMEOUT)
+    return top
+
+
+def top_ids():
+    """Return the cached top K tweet ids, computing them on a miss."""
+    return cache.read_through(
+        TOP_KEY, _top_ids, settings.POPULAR_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,31 @@
+"""
+Full-text tweet search.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from core.models import Tweet
+
+
+def search_tweets(text):
+    """Return tweets matching a web-style search, annotated with ``rank``.
+
+    The GIN index on ``search_vector`` finds the matches; only the newest
+    ``TWEET_SEARCH_CANDIDATES`` of them are ranked, which keeps searches
+    for common terms from ranking millions of rows. ``ts_rank`` returns
+    a ``real``; it is cast to ``double precision`` so a rank read into a
+    Python float compares equal to the stored one in cursor filters.
+    """
+    query = SearchQuery(
+        text,
+        config=settings.TWEET_SEARCH_CONFIG,
+        search_type='websearch',
+    )
+    candidates = Tweet.objects.filter(
+        search_vector=query,
+    ).order_by('-id').values('id')[:settings.TWEET_SEARCH_CANDIDATES]
+    return Tweet.objects.filter(id__in=candidates).annotate(
+        rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+    )
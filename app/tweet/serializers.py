@@ -1,8 +1,12 @@
 """
 Serializers for tweet APIs
 """
+from django.conf import settings
 from rest_framework import serializers
+from core.fields import FieldSelection, SparseFieldsMixin
+from core.metrics import TimedSerializerMixin
 from core.models import Tweet, User
+from core.rows import RowSerializer, iso_datetime
 from django.contrib.auth import get_user_model
 
 
@@ -19,14 +23,37 @@ class LikedUserSerializer(serializers.ModelSerializer):
         read_only_fields = ['name', 'email']
 
 
-class TweetSerializer(serializers.ModelSerializer):
+class TweetSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer,
+):
     """Serializer for tweets."""
-    likes = LikedUserSerializer(many=True, required=False)
+    liked_by_me = serializers.SerializerMethodField()
+    expanded_fields = {
+        'user': lambda: LikedUserSerializer(read_only=True),
+        'likes': lambda: LikedUserSerializer(many=True, read_only=True),
+    }
 
     class Meta:
         model = Tweet
-        fields = ['id', 'user', 'tweet_text', 'likes', 'created', 'updated']
-        read_only_fields = ['id']
+        fields = [
+            'id',
+            'user',
+            'tweet_text',
+            'like_count',
+            'liked_by_me',
+            'created',
+            'updated',
+        ]
+        read_only_fields = ['id', 'user', 'like_count']
+
+    def get_liked_by_me(self, obj):
+        """Return whether the requesting user liked the tweet."""
+        if hasattr(obj, 'liked_by_me'):
+            return obj.liked_by_me
+        request = self.context.get('request')
+        if request is None or not request.user.is_authenticated:
+            return False
+        return obj.likes.filter(id=request.user.id).exists()
 
     def create(self, validated_data):
         """Create tweet."""
@@ -41,17 +68,92 @@ class TweetSerializer(serializers.ModelSerializer):
         return instance
 
 
+class TweetRowSerializer(RowSerializer):
+    """Read-only ``TweetSerializer`` for rows annotated with ``liked_by_me``.
+
+    An expanded ``user`` is joined into each row; expanded ``likes`` are
+    read for a whole batch of rows in one query.
+    """
+    fields = tuple(TweetSerializer.Meta.fields)
+    converters = {'created': iso_datetime, 'updated': iso_datetime}
+    user_fields = LikedUserSerializer.Meta.fields
+
+    def __init__(self, *args, selection=None, **kwargs):
+        super().__init__(*args, selection=selection, **kwargs)
+        if selection is None:
+            selection = FieldSelection()
+        self.expand_user = selection.expands('user')
+        self.expand_likes = selection.expands('likes')
+        if self.expand_likes:
+            self.fields += ('likes',)
+
+    def columns(self):
+        columns = [name for name in self.fields if name != 'likes']
+        if self.expand_user:
+            columns.remove('user')
+            columns.extend(f'user__{name}' for name in self.user_fields)
+        if self.expand_likes:
+            columns.append('id')
+        return columns
+
+    def prepare(self, rows):
+        if self.expand_user:
+            for row in rows:
+                row['user'] = {
+                    name: row.pop(f'user__{name}') for name in self.user_fields
+                }
+        if self.expand_likes:
+            likes = {row['id']: [] for row in rows}
+            likers = Tweet.likes.through.objects.filter(
+                tweet_id__in=likes,
+            ).order_by('id').values_list(
+                'tweet_id', *(f'user__{name}' for name in self.user_fields),
+            )
+            for tweet_id, *values in likers:
+                likes[tweet_id].append(dict(zip(self.user_fields, values)))
+            for row in rows:
+                row['likes'] = likes[row['id']]
+
+
 class TweetDetailSerializer(TweetSerializer):
     """Serializer for tweet detail view."""
+    likes = LikedUserSerializer(many=True, required=False)
 
     class Meta(TweetSerializer.Meta):
-        fields = TweetSerializer.Meta.fields
+        fields = TweetSerializer.Meta.fields + ['likes']
 
 
-class LikeSerializer(serializers.ModelSerializer):
+class LikeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for like tweet view."""
     id = serializers.IntegerField()
 
     class Meta():
         model = Tweet
-        fields = ['id']
\ No newline at end of file
+        fields = ['id']
+
+
+class TweetSearchSerializer(serializers.Serializer):
+    """Serializer for tweet search parameters."""
+    q = serializers.CharField(max_length=200)
+
+
+class TrendingQuerySerializer(serializers.Serializer):
+    """Serializer for trending hashtag parameters."""
+    window = serializers.ChoiceField(
+        choices=list(settings.TRENDING_WINDOWS),
+        default='1h',
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.TRENDING_MAX_RESULTS,
+        default=10,
+    )
+
+
+class BulkLikeSerializer(serializers.Serializer):
+    """Serializer for liking or unliking many tweets."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_LIKE_MAX_IDS,
+    )
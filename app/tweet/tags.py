@@ -0,0 +1,99 @@
+"""
+Hashtag and mention extraction.
+
+Tags are parsed when a tweet is written and stored casefolded in the
+Hashtag and Mention tables, so topic lookups use an index instead of
+scanning tweet_text. Signal handlers index every tweet saved or deleted
+through the ORM in the transaction of the write; tweets inserted in bulk
+are indexed with ``index_tweets``.
+"""
+import itertools
+import re
+from collections import Counter
+
+from django.db import transaction
+
+from core.models import Hashtag, Mention
+from tweet import trending
+
+HASHTAG_RE = re.compile(r'(?<![\w#])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w@])@(\w{1,100})')
+
+
+def extract(text):
+    """Return the casefolded hashtags and mentions of a text as sets."""
+    hashtags = {tag.casefold() for tag in HASHTAG_RE.findall(text)}
+    mentions = {handle.casefold() for handle in MENTION_RE.findall(text)}
+    return hashtags, mentions
+
+
+def index_tweet(tweet, created=False):
+    """Store a tweet's hashtags and mentions and update trending counts.
+
+    On edits only the difference to the stored tags is written.
+    """
+    hashtags, mentions = extract(tweet.tweet_text)
+    with transaction.atomic():
+        old_hashtags = set() if created else set(
+            tweet.hashtags.values_list('name', flat=True)
+        )
+        old_mentions = set() if created else set(
+            tweet.mentions.values_list('handle', flat=True)
+        )
+        added, removed = hashtags - old_hashtags, old_hashtags - hashtags
+        if removed:
+            tweet.hashtags.filter(name__in=removed).delete()
+        if old_mentions - mentions:
+            tweet.mentions.filter(handle__in=old_mentions - mentions).delete()
+        Hashtag.objects.bulk_create(
+            [Hashtag(tweet=tweet, name=name) for name in added],
+            ignore_conflicts=True,
+        )
+        Mention.objects.bulk_create(
+            [
+                Mention(tweet=tweet, handle=handle)
+                for handle in mentions - old_mentions
+            ],
+            ignore_conflicts=True,
+        )
+        trending.count_hashtags(added, tweet.created, 1)
+        trending.count_hashtags(removed, tweet.created, -1)
+
+
+def index_tweets(rows, batch_size=1000):
+    """Index new tweets from ``(id, tweet_text, created)`` rows in bulk.
+
+    For tweets inserted without ``save()``, which sends no signals.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        hashtags, mentions, counts = [], [], Counter()
+        for tweet_id, text, created in batch:
+            names, handles = extract(text)
+            hashtags += [
+                Hashtag(tweet_id=tweet_id, name=name) for name in names
+            ]
+            mentions += [
+                Mention(tweet_id=tweet_id, handle=handle) for handle in handles
+            ]
+            bucket = trending.bucket_start(created)
+            counts.update((name, bucket) for name in names)
+        with transaction.atomic():
+            Hashtag.objects.bulk_create(hashtags, ignore_conflicts=True)
+            Mention.objects.bulk_create(mentions, ignore_conflicts=True)
+            trending.add_hashtag_counts(counts)
+
+
+def unindex_tweet(tweet):
+    """Remove a deleted tweet's hashtags from the trending counts.
+
+    The Hashtag and Mention rows go with the tweet by cascade.
+    """
+    trending.count_hashtags(
+        set(tweet.hashtags.values_list('name', flat=True)),
+        tweet.created,
+        -1,
+    )
@@ -0,0 +1,85 @@
+"""Tests for the async tweet views."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.authentication import token_cache
+from core.models import Tweet
+
+ASYNC_TIMELINE_URL = reverse('tweet:async-timeline')
+
+
+def async_like_url(tweet_id):
+    """Create and return an async tweet like URL."""
+    return reverse('tweet:async-like', args=[tweet_id])
+
+
+class AsyncViewTests(TestCase):
+    """Test the async tweet views."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_auth_required(self):
+        """Test auth is required to call the async views."""
+        res = APIClient().get(ASYNC_TIMELINE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_like_and_unlike(self):
+        """Test liking and unliking through the async view."""
+        tweet = Tweet.objects.create(user=self.user, tweet_text='test tweet')
+
+        res = self.client.post(async_like_url(tweet.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        tweet.refresh_from_db()
+        self.assertEqual(tweet.like_count, 1)
+
+        res = self.client.delete(async_like_url(tweet.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        tweet.refresh_from_db()
+        self.assertEqual(tweet.like_count, 0)
+
+    def test_like_missing_tweet_returns_404(self):
+        """Test liking a missing tweet through the async view."""
+        res = self.client.post(async_like_url(999999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_timeline(self):
+        """Test reading the home timeline through the async view."""
+        res = self.client.post(
+            reverse('tweet:tweet-list'),
+            {'tweet_text': 'hi'},
+        )
+
+        res = self.client.get(ASYNC_TIMELINE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()['results']), 1)
+
+    def test_timeline_sparse_fields(self):
+        """Test the async timeline outputs only the requested fields."""
+        self.client.post(reverse('tweet:tweet-list'), {'tweet_text': 'hi'})
+
+        res = self.client.get(ASYNC_TIMELINE_URL, {'fields': 'tweet_text'})
+
+        self.assertEqual(res.json()['results'], [{'tweet_text': 'hi'}])
+
+    def test_timeline_unknown_field_rejected(self):
+        """Test the async timeline validates the field selection."""
+        res = self.client.get(ASYNC_TIMELINE_URL, {'fields': 'secret'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
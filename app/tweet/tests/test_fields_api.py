@@ -0,0 +1,142 @@
+"""Tests for sparse fieldsets and expansion on the tweet APIs."""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tweet
+
+TWEETS_URL = reverse('tweet:tweet-list')
+
+
+def detail_url(tweet_id):
+    """Create and return a tweet detail URL."""
+    return reverse('tweet:tweet-detail', args=[tweet_id])
+
+
+def create_user(**params):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**params)
+
+
+class TweetFieldsApiTests(TestCase):
+    """Test the fields and expand parameters of tweet reads."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test',
+        )
+        self.client.force_authenticate(self.user)
+        self.tweet = Tweet.objects.create(
+            user=self.user,
+            tweet_text='test tweet',
+        )
+        self.likers = [
+            create_user(email=f'liker{i}@example.com', password='testpass123')
+            for i in range(3)
+        ]
+        self.tweet.likes.add(*self.likers)
+
+    def test_list_sparse_fields(self):
+        """Test the list outputs only the requested fields."""
+        res = self.client.get(TWEETS_URL, {'fields': 'id,tweet_text'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'id': self.tweet.id, 'tweet_text': 'test tweet'},
+        ])
+
+    def test_list_sparse_fields_paginated(self):
+        """Test cursors work when the cursor key is not output."""
+        other = Tweet.objects.create(user=self.user, tweet_text='newer tweet')
+
+        res = self.client.get(
+            TWEETS_URL,
+            {'fields': 'tweet_text', 'page_size': 1},
+        )
+        second = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            res.data['results'],
+            [{'tweet_text': other.tweet_text}],
+        )
+        self.assertEqual(
+            second.data['results'],
+            [{'tweet_text': 'test tweet'}],
+        )
+
+    def test_list_skips_unselected_annotation(self):
+        """Test liked_by_me is not computed unless it is output."""
+        with self.assertNumQueries(1) as queries:
+            self.client.get(TWEETS_URL, {'fields': 'id'})
+
+        self.assertNotIn('EXISTS', queries.captured_queries[0]['sql'])
+
+    def test_list_expand_user_and_likes(self):
+        """Test expanded relations are nested in the list."""
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                TWEETS_URL,
+                {'fields': 'id', 'expand': 'user,likes'},
+            )
+
+        tweet = res.data['results'][0]
+        self.assertEqual(tweet['user'], {
+            'id': self.user.id,
+            'name': 'Test',
+            'email': 'test@example.com',
+        })
+        self.assertEqual(
+            {u['id'] for u in tweet['likes']},
+            {u.id for u in self.likers},
+        )
+
+    def test_detail_skips_unselected_likes(self):
+        """Test the likers are not prefetched when not requested."""
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                detail_url(self.tweet.id),
+                {'fields': 'id,like_count'},
+            )
+
+        self.assertEqual(set(res.data), {'id', 'like_count'})
+
+    def test_detail_expand_user(self):
+        """Test the author is joined into the detail when expanded."""
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                detail_url(self.tweet.id),
+                {'expand': 'user'},
+            )
+
+        self.assertEqual(res.data['user']['email'], 'test@example.com')
+        self.assertEqual(len(res.data['likes']), 3)
+
+    def test_unknown_field_rejected(self):
+        """Test unknown fields and expansions return an error."""
+        res = self.client.get(
+            TWEETS_URL,
+            {'fields': 'id,secret', 'expand': 'tweet_text'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+        self.assertIn('expand', res.data)
+
+    def test_writes_return_every_field(self):
+        """Test fields does not narrow the response to a write."""
+        res = self.client.post(
+            f'{TWEETS_URL}?fields=id',
+            {'tweet_text': 'new tweet'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn('tweet_text', res.data)
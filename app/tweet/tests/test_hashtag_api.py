@@ -0,0 +1,168 @@
+"""Tests for hashtag indexing and trending hashtags."""
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Hashtag, HashtagCount, Mention, Tweet
+from tweet import tags, trending
+
+TWEETS_URL = reverse('tweet:tweet-list')
+TRENDING_URL = reverse('tweet:trending')
+
+
+def detail_url(tweet_id):
+    """Create and return a tweet detail URL."""
+    return reverse('tweet:tweet-detail', args=[tweet_id])
+
+
+def hashtag_url(name):
+    """Create and return a hashtag tweets URL."""
+    return reverse('tweet:hashtag', args=[name])
+
+
+class ExtractTests(SimpleTestCase):
+    """Test parsing hashtags and mentions."""
+
+    def test_extract(self):
+        """Test tags are casefolded and deduplicated."""
+        hashtags, mentions = tags.extract(
+            'Hello @Alice and @bob! #Django #django #perf_2024 '
+            'mail@example.com a#b',
+        )
+
+        self.assertEqual(hashtags, {'django', 'perf_2024'})
+        self.assertEqual(mentions, {'alice', 'bob'})
+
+
+class HashtagApiTests(TestCase):
+    """Test hashtag indexing through the tweet API."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def post_tweet(self, text):
+        res = self.client.post(TWEETS_URL, {'tweet_text': text})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data['id']
+
+    def test_create_indexes_tags(self):
+        """Test posting a tweet stores its hashtags and mentions."""
+        tweet_id = self.post_tweet('Shipping #Django with @Alice')
+
+        res = self.client.get(hashtag_url('DJANGO'))
+
+        self.assertEqual([t['id'] for t in res.data['results']], [tweet_id])
+        self.assertTrue(
+            Mention.objects.filter(tweet_id=tweet_id, handle='alice').exists(),
+        )
+
+    def test_trending_counts(self):
+        """Test trending hashtags are ordered by use count."""
+        self.post_tweet('#python #django')
+        self.post_tweet('#django')
+
+        res = self.client.get(TRENDING_URL, {'window': '1h'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'hashtag': 'django', 'count': 2},
+            {'hashtag': 'python', 'count': 1},
+        ])
+
+    def test_trending_window(self):
+        """Test buckets outside the window are not counted."""
+        old = timezone.now() - datetime.timedelta(hours=3)
+        trending.count_hashtags({'old'}, old, 5)
+        self.post_tweet('#new')
+
+        hour = self.client.get(TRENDING_URL, {'window': '1h'})
+        day = self.client.get(TRENDING_URL, {'window': '24h'})
+
+        self.assertEqual([r['hashtag'] for r in hour.data['results']], ['new'])
+        self.assertEqual(
+            [r['hashtag'] for r in day.data['results']],
+            ['old', 'new'],
+        )
+
+    def test_edit_and_delete_update_counts(self):
+        """Test editing and deleting a tweet adjust the counters."""
+        tweet_id = self.post_tweet('#first #second')
+
+        self.client.patch(
+            detail_url(tweet_id),
+            {'tweet_text': '#second #third'},
+        )
+        counts = dict(HashtagCount.objects.values_list('name', 'count'))
+        self.assertEqual(counts, {'first': 0, 'second': 1, 'third': 1})
+
+        self.client.delete(detail_url(tweet_id))
+        counts = dict(HashtagCount.objects.values_list('name', 'count'))
+        self.assertEqual(counts, {'first': 0, 'second': 0, 'third': 0})
+
+    def test_orm_writes_update_counts(self):
+        """Test tweets written outside the API are indexed."""
+        tweet = Tweet.objects.create(user=self.user, tweet_text='#orm @Alice')
+        self.assertTrue(
+            Hashtag.objects.filter(tweet=tweet, name='orm').exists(),
+        )
+
+        tweet.tweet_text = '#edited'
+        tweet.save()
+        tweet.delete()
+
+        counts = dict(HashtagCount.objects.values_list('name', 'count'))
+        self.assertEqual(counts, {'orm': 0, 'edited': 0})
+
+    def test_index_tweets_in_bulk(self):
+        """Test tweets inserted without save() are indexed in bulk."""
+        tweets = Tweet.objects.bulk_create([
+            Tweet(user=self.user, tweet_text='#bulk @Alice'),
+            Tweet(user=self.user, tweet_text='#bulk #more'),
+        ])
+
+        tags.index_tweets(
+            Tweet.objects.filter(id__in=[t.id for t in tweets]).values_list(
+                'id', 'tweet_text', 'created',
+            ),
+        )
+
+        counts = dict(HashtagCount.objects.values_list('name', 'count'))
+        self.assertEqual(counts, {'bulk': 2, 'more': 1})
+        self.assertEqual(Mention.objects.filter(handle='alice').count(), 1)
+
+    def test_invalid_window(self):
+        """Test an unknown window is rejected."""
+        res = self.client.get(TRENDING_URL, {'window': '7d'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prune_trending(self):
+        """Test the prune command drops buckets older than every window."""
+        trending.count_hashtags(
+            {'old'},
+            timezone.now() - datetime.timedelta(days=2),
+            1,
+        )
+        trending.count_hashtags({'new'}, timezone.now(), 1)
+
+        call_command('prune_trending', stdout=StringIO())
+
+        self.assertEqual(
+            list(HashtagCount.objects.values_list('name', flat=True)),
+            ['new'],
+        )
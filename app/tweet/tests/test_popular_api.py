@@ -0,0 +1,119 @@
+"""Tests for the popular tweets API."""
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PopularTweet, Tweet
+from tweet import likes
+
+POPULAR_URL = reverse('tweet:popular')
+
+
+def create_users(count):
+    """Create and return several users."""
+    return [
+        get_user_model().objects.create_user(
+            email=f'user{i}@example.com',
+            password='testpass123',
+        )
+        for i in range(count)
+    ]
+
+
+def create_tweet(user, hours_ago=0):
+    """Create and return a tweet created some hours ago."""
+    tweet = Tweet.objects.create(user=user, tweet_text='tweet')
+    Tweet.objects.filter(id=tweet.id).update(
+        created=timezone.now() - datetime.timedelta(hours=hours_ago),
+    )
+    return tweet
+
+
+class PopularTweetsApiTests(TestCase):
+    """Test ranking tweets by decayed likes."""
+
+    def setUp(self):
+        cache.clear()
+        self.users = create_users(4)
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def like(self, tweet, count):
+        for user in self.users[:count]:
+            likes.add_likes(user, [tweet.id])
+
+    def test_likes_decay_with_age(self):
+        """Test a fresh tweet outranks an older one with more likes."""
+        old = create_tweet(self.users[0], hours_ago=24)
+        new = create_tweet(self.users[0])
+        self.like(old, 3)
+        self.like(new, 1)
+
+        res = self.client.get(POPULAR_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [new.id, old.id],
+        )
+        self.assertTrue(res.data['results'][1]['liked_by_me'])
+
+    def test_more_likes_rank_higher(self):
+        """Test tweets of the same age are ordered by likes."""
+        first = create_tweet(self.users[0])
+        second = create_tweet(self.users[0])
+        self.like(first, 1)
+        self.like(second, 2)
+
+        res = self.client.get(POPULAR_URL)
+
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [second.id, first.id],
+        )
+
+    def test_unliked_and_aged_tweets_not_ranked(self):
+        """Test tweets without likes or past the max age are left out."""
+        unliked = create_tweet(self.users[0])
+        aged = create_tweet(self.users[0], hours_ago=100)
+        self.like(unliked, 1)
+        self.like(aged, 2)
+        likes.remove_likes(self.users[0], [unliked.id])
+
+        self.assertFalse(PopularTweet.objects.exists())
+
+    def test_refresh_command_caches_top(self):
+        """Test reads use the top ids cached by the periodic refresh."""
+        tweet = create_tweet(self.users[0])
+        self.like(tweet, 1)
+        call_command(
+            'refresh_popular_tweets', stdout=StringIO(), stderr=StringIO(),
+        )
+        newer = create_tweet(self.users[0])
+        self.like(newer, 2)
+
+        res = self.client.get(POPULAR_URL)
+
+        self.assertEqual([t['id'] for t in res.data['results']], [tweet.id])
+
+    def test_rebuild_scores(self):
+        """Test rebuilding scores ranks tweets liked outside the API."""
+        tweet = create_tweet(self.users[0])
+        Tweet.objects.filter(id=tweet.id).update(like_count=5)
+
+        call_command(
+            'refresh_popular_tweets', rebuild=True,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+        res = self.client.get(POPULAR_URL)
+
+        self.assertEqual([t['id'] for t in res.data['results']], [tweet.id])
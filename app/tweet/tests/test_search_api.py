@@ -0,0 +1,121 @@
+"""Tests for the tweet search API."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tweet
+
+SEARCH_URL = reverse('tweet:search')
+
+
+def create_user(**params):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**params)
+
+
+class PublicSearchApiTests(TestCase):
+    """Test unauthenticated search requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to search."""
+        res = APIClient().get(SEARCH_URL, {'q': 'django'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateSearchApiTests(TestCase):
+    """Test authenticated search requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        self.other = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_search_matches_stemmed_words(self):
+        """Test tweets by any user match on stemmed words."""
+        match = Tweet.objects.create(
+            user=self.other,
+            tweet_text='Running Django tests',
+        )
+        Tweet.objects.create(user=self.other, tweet_text='Cooking dinner')
+
+        res = self.client.get(SEARCH_URL, {'q': 'run'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['id'] for t in res.data['results']], [match.id])
+
+    def test_search_vector_follows_edits(self):
+        """Test the search vector is kept up to date by queryset updates."""
+        tweet = Tweet.objects.create(user=self.user, tweet_text='Old text')
+        Tweet.objects.filter(id=tweet.id).update(tweet_text='Postgres search')
+
+        res = self.client.get(SEARCH_URL, {'q': 'postgres'})
+
+        self.assertEqual([t['id'] for t in res.data['results']], [tweet.id])
+
+    def test_search_ranked(self):
+        """Test better matches come first."""
+        weak = Tweet.objects.create(
+            user=self.other,
+            tweet_text='django and other things entirely',
+        )
+        strong = Tweet.objects.create(
+            user=self.other,
+            tweet_text='django django django',
+        )
+
+        res = self.client.get(SEARCH_URL, {'q': 'django'})
+
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [strong.id, weak.id],
+        )
+
+    def test_search_paginated(self):
+        """Test equally ranked results are split into cursor linked pages."""
+        tweets = [
+            Tweet.objects.create(
+                user=self.other,
+                tweet_text=f'keyset page {i}',
+            )
+            for i in range(5)
+        ]
+
+        first = self.client.get(SEARCH_URL, {'q': 'keyset', 'page_size': 3})
+        second = self.client.get(first.data['next'])
+
+        ids = [t['id'] for t in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, [t.id for t in reversed(tweets)])
+        self.assertIsNone(second.data['next'])
+
+    @override_settings(TWEET_SEARCH_CANDIDATES=2)
+    def test_search_ranks_newest_candidates(self):
+        """Test only the newest matches are ranked."""
+        tweets = [
+            Tweet.objects.create(user=self.other, tweet_text=f'limit {i}')
+            for i in range(4)
+        ]
+
+        res = self.client.get(SEARCH_URL, {'q': 'limit'})
+
+        self.assertEqual(
+            {t['id'] for t in res.data['results']},
+            {tweets[2].id, tweets[3].id},
+        )
+
+    def test_search_requires_query(self):
+        """Test searching without a query fails."""
+        res = self.client.get(SEARCH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,166 @@
+"""Tests for the home timeline API."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import jobs
+from core.models import TimelineEntry, Tweet
+
+TWEETS_URL = reverse('tweet:tweet-list')
+TIMELINE_URL = reverse('tweet:timeline')
+FOLLOW_URL = reverse('user:follow')
+UNFOLLOW_URL = reverse('user:unfollow')
+
+
+def create_user(**params):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(**params)
+
+
+class PublicTimelineApiTests(TestCase):
+    """Test unauthenticated timeline requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to read the timeline."""
+        res = self.client.get(TIMELINE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateTimelineApiTests(TestCase):
+    """Test authenticated timeline requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        self.other = create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def post_as(self, user, text):
+        """Create a tweet through the API as the given user."""
+        client = APIClient()
+        client.force_authenticate(user)
+        res = client.post(TWEETS_URL, {'tweet_text': text})
+        jobs.run_pending(['fanout'])
+        return Tweet.objects.get(id=res.data['id'])
+
+    def test_timeline_includes_followed_and_own_tweets(self):
+        """Test tweets by followed accounts and the user are pushed."""
+        self.user.follows.add(self.other)
+        stranger = create_user(
+            email='stranger@example.com',
+            password='testpass123',
+        )
+        own = self.post_as(self.user, 'own tweet')
+        followed = self.post_as(self.other, 'followed tweet')
+        self.post_as(stranger, 'stranger tweet')
+
+        res = self.client.get(TIMELINE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [followed.id, own.id],
+        )
+
+    @override_settings(TIMELINE_FANOUT_THRESHOLD=1)
+    def test_high_follower_tweets_are_pulled(self):
+        """Test tweets by high-follower accounts are merged on read."""
+        self.user.follows.add(self.other)
+        first = self.post_as(self.user, 'first')
+        second = self.post_as(self.other, 'second')
+        third = self.post_as(self.user, 'third')
+
+        res = self.client.get(TIMELINE_URL)
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(
+                owner=self.user, tweet=second,
+            ).exists()
+        )
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [third.id, second.id, first.id],
+        )
+
+    def test_cursor_pagination(self):
+        """Test paging through the timeline with cursors."""
+        tweets = [self.post_as(self.user, f'tweet {i}') for i in range(3)]
+
+        res = self.client.get(TIMELINE_URL, {'page_size': 1})
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [tweets[2].id],
+        )
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [tweets[1].id],
+        )
+
+        res = self.client.get(res.data['previous'])
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [tweets[2].id],
+        )
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Test following backfills and unfollowing prunes the timeline."""
+        tweet = self.post_as(self.other, 'earlier tweet')
+
+        self.client.post(FOLLOW_URL, {'id': self.other.id})
+        res = self.client.get(TIMELINE_URL)
+        self.assertEqual([t['id'] for t in res.data['results']], [tweet.id])
+
+        self.client.post(UNFOLLOW_URL, {'id': self.other.id})
+        res = self.client.get(TIMELINE_URL)
+        self.assertEqual(res.data['results'], [])
+
+    @override_settings(TIMELINE_FANOUT_THRESHOLD=2)
+    def test_pulled_tweets_pushed_when_below_threshold(self):
+        """Test tweets of an account falling below the threshold are pushed."""
+        third = create_user(email='third@example.com', password='testpass')
+        self.user.follows.add(self.other)
+        third.follows.add(self.other)
+        tweet = self.post_as(self.other, 'pulled tweet')
+        client = APIClient()
+        client.force_authenticate(third)
+
+        client.post(UNFOLLOW_URL, {'id': self.other.id})
+        jobs.run_pending(['fanout'])
+        res = self.client.get(TIMELINE_URL)
+
+        self.assertTrue(
+            TimelineEntry.objects.filter(owner=self.user, tweet=tweet).exists()
+        )
+        self.assertEqual([t['id'] for t in res.data['results']], [tweet.id])
+
+    @override_settings(TIMELINE_FANOUT_THRESHOLD=1)
+    def test_query_count_independent_of_follows(self):
+        """Test reading the timeline costs a bounded number of queries."""
+        for i in range(5):
+            author = create_user(
+                email=f'author{i}@example.com',
+                password='pass12345',
+            )
+            self.user.follows.add(author)
+            self.post_as(author, f'tweet {i}')
+
+        with self.assertNumQueries(3):
+            res = self.client.get(TIMELINE_URL)
+
+        self.assertEqual(len(res.data['results']), 5)
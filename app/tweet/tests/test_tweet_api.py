@@ -1,6 +1,10 @@
 """Tests for tweet APIs."""
 
+import json
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -11,6 +15,12 @@ from core.models import Tweet
 from tweet.serializers import TweetSerializer, TweetDetailSerializer
 
 TWEETS_URL = reverse('tweet:tweet-list')
+BULK_LIKE_URL = reverse('tweet:like-bulk')
+
+
+def like_url(tweet_id):
+    """Create and return a tweet like URL."""
+    return reverse('tweet:like', args=[tweet_id])
 
 def detail_url(tweet_id):
     """Create and return a tweet detail URL."""
@@ -50,7 +60,7 @@ class PrivateTweetApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
-            username = 'username123',
+            name = 'username123',
             email = 'test@example.com',
             password = 'testpass123',
         )
@@ -66,12 +76,12 @@ class PrivateTweetApiTests(TestCase):
         tweets = Tweet.objects.all().order_by('-id')
         serializer = TweetSerializer(tweets, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tweet_list_limited_to_user(self):
         """Test list of tweets is limited to authenticated user."""
         other_user = get_user_model().objects.create_user(
-            username = 'othername123',
+            name = 'othername123',
             email = 'other@example.com',
             password = 'otherpass123',
         )
@@ -83,7 +93,7 @@ class PrivateTweetApiTests(TestCase):
         tweets = Tweet.objects.filter(user=self.user)
         serializer = TweetSerializer(tweets, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_tweet_detail(self):
         """Test get tweet detail."""
@@ -137,7 +147,7 @@ class PrivateTweetApiTests(TestCase):
     def test_update_user_returns_error(self):
         """Test changing the user of the tweet results in an error."""
         new_user = create_user(
-            username = 'othername123',
+            name = 'othername123',
             email = 'other@example.com',
             password = 'otherpass123',
         )
@@ -162,7 +172,7 @@ class PrivateTweetApiTests(TestCase):
     def test_recipe_other_users_recipe_error(self):
         """Test trying to delete another users tweet gives error."""
         new_user = create_user(
-            username = 'othername123',
+            name = 'othername123',
             email = 'other@example.com',
             password = 'otherpass123',
         )
@@ -172,4 +182,239 @@ class PrivateTweetApiTests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
-        self.assertTrue(Tweet.objects.filter(id=tweet.id).exists())
\ No newline at end of file
+        self.assertTrue(Tweet.objects.filter(id=tweet.id).exists())
+
+    def test_list_paginated_with_cursors(self):
+        """Test the tweet list is split into cursor linked pages."""
+        tweets = [
+            create_tweet(user=self.user, tweet_text=f'tweet {i}')
+            for i in range(3)
+        ]
+
+        res = self.client.get(TWEETS_URL, {'page_size': 2})
+
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [tweets[2].id, tweets[1].id],
+        )
+        self.assertIsNone(res.data['previous'])
+
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            [t['id'] for t in res.data['results']],
+            [tweets[0].id],
+        )
+        self.assertIsNone(res.data['next'])
+
+    def test_list_streamed(self):
+        """Test the whole tweet list is streamed as one JSON array."""
+        tweets = [
+            create_tweet(user=self.user, tweet_text=f'tweet {i}')
+            for i in range(3)
+        ]
+
+        with self.settings(STREAM_CHUNK_SIZE=2):
+            res = self.client.get(TWEETS_URL, {'stream': 'true'})
+            data = json.loads(b''.join(res.streaming_content))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [t['id'] for t in data],
+            [t.id for t in reversed(tweets)],
+        )
+        self.assertEqual(data[0]['tweet_text'], 'tweet 2')
+
+    def test_list_invalid_cursor(self):
+        """Test an invalid cursor returns not found."""
+        res = self.client.get(TWEETS_URL, {'before': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_like_updates_like_count_once(self):
+        """Test liking twice only counts one like."""
+        tweet = create_tweet(user=self.user, tweet_text='test tweet')
+
+        self.client.post(like_url(tweet.id))
+        self.client.post(like_url(tweet.id))
+
+        tweet.refresh_from_db()
+        self.assertEqual(tweet.like_count, 1)
+        self.assertTrue(tweet.likes.filter(id=self.user.id).exists())
+
+    def test_unlike_updates_like_count_once(self):
+        """Test removing a like twice only removes one like."""
+        tweet = create_tweet(user=self.user, tweet_text='test tweet')
+        self.client.post(like_url(tweet.id))
+
+        self.client.delete(like_url(tweet.id))
+        self.client.delete(like_url(tweet.id))
+
+        tweet.refresh_from_db()
+        self.assertEqual(tweet.like_count, 0)
+        self.assertFalse(tweet.likes.exists())
+
+    def test_list_returns_like_summary(self):
+        """Test the list returns like counts instead of likers."""
+        tweet = create_tweet(user=self.user, tweet_text='liked tweet')
+        other = create_tweet(user=self.user, tweet_text='other tweet')
+        self.client.post(like_url(tweet.id))
+
+        res = self.client.get(TWEETS_URL)
+
+        summaries = {t['id']: t for t in res.data['results']}
+        self.assertNotIn('likes', summaries[tweet.id])
+        self.assertEqual(summaries[tweet.id]['like_count'], 1)
+        self.assertTrue(summaries[tweet.id]['liked_by_me'])
+        self.assertEqual(summaries[other.id]['like_count'], 0)
+        self.assertFalse(summaries[other.id]['liked_by_me'])
+
+    def test_list_query_count_independent_of_page_size(self):
+        """Test listing tweets does not query per tweet."""
+        liker = create_user(email='liker@example.com', password='testpass123')
+        for i in range(5):
+            tweet = create_tweet(user=self.user, tweet_text=f'tweet {i}')
+            tweet.likes.add(self.user, liker)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(TWEETS_URL)
+
+        self.assertEqual(len(res.data['results']), 5)
+
+    def test_detail_query_count_independent_of_likes(self):
+        """Test the tweet detail loads likers in one query."""
+        tweet = create_tweet(user=self.user, tweet_text='test tweet')
+        for i in range(5):
+            tweet.likes.add(
+                create_user(
+                    email=f'liker{i}@example.com',
+                    password='testpass123',
+                )
+            )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(detail_url(tweet.id))
+
+        self.assertEqual(len(res.data['likes']), 5)
+
+    def test_like_missing_tweet_returns_404(self):
+        """Test liking a tweet that does not exist returns not found."""
+        res = self.client.post(like_url(999999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_like(self):
+        """Test liking many tweets reports a result per id."""
+        first = create_tweet(user=self.user, tweet_text='first')
+        second = create_tweet(user=self.user, tweet_text='second')
+        self.client.post(like_url(second.id))
+
+        payload = {'ids': [first.id, second.id, 999999, first.id]}
+        res = self.client.post(BULK_LIKE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'id': first.id, 'status': 'liked'},
+            {'id': second.id, 'status': 'unchanged'},
+            {'id': 999999, 'status': 'not_found'},
+        ])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.like_count, 1)
+        self.assertEqual(second.like_count, 1)
+
+    def test_bulk_unlike(self):
+        """Test removing many likes reports a result per id."""
+        first = create_tweet(user=self.user, tweet_text='first')
+        second = create_tweet(user=self.user, tweet_text='second')
+        self.client.post(like_url(first.id))
+
+        payload = {'ids': [first.id, second.id]}
+        res = self.client.delete(BULK_LIKE_URL, payload, format='json')
+
+        self.assertEqual(res.data['results'], [
+            {'id': first.id, 'status': 'unliked'},
+            {'id': second.id, 'status': 'unchanged'},
+        ])
+        first.refresh_from_db()
+        self.assertEqual(first.like_count, 0)
+
+    def test_bulk_like_limits_ids(self):
+        """Test a batch over the maximum size is rejected."""
+        payload = {'ids': list(range(1, 102))}
+        res = self.client.post(BULK_LIKE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalTweetApiTests(TestCase):
+    """Test ETag and Last-Modified handling of tweet reads."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        self.tweet = create_tweet(user=self.user, tweet_text='test tweet')
+        self.client.force_authenticate(self.user)
+
+    def test_unchanged_list_not_modified(self):
+        """Test a matching If-None-Match returns 304 without queries."""
+        res = self.client.get(TWEETS_URL)
+        etag = res['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TWEETS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_etag_differs_per_url(self):
+        """Test the list and detail responses have different ETags."""
+        list_etag = self.client.get(TWEETS_URL)['ETag']
+
+        res = self.client.get(
+            detail_url(self.tweet.id),
+            HTTP_IF_NONE_MATCH=list_etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_like_changes_etag(self):
+        """Test liking a tweet invalidates its ETag."""
+        url = detail_url(self.tweet.id)
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(like_url(self.tweet.id))
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['like_count'], 1)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_create_changes_etag(self):
+        """Test posting a tweet invalidates the list ETag."""
+        etag = self.client.get(TWEETS_URL)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(TWEETS_URL, {'tweet_text': 'new tweet'})
+        res = self.client.get(TWEETS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_if_modified_since(self):
+        """Test Last-Modified is sent once its second has passed."""
+        self.client.get(TWEETS_URL)
+        with mock.patch('core.conditional.time.time', return_value=4102444800):
+            res = self.client.get(TWEETS_URL)
+            last_modified = res['Last-Modified']
+            res = self.client.get(
+                TWEETS_URL,
+                HTTP_IF_MODIFIED_SINCE=last_modified,
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,151 @@
+"""
+Home timeline fan-out and assembly.
+
+Tweets by accounts below ``TIMELINE_FANOUT_THRESHOLD`` followers are pushed
+into every follower's ``TimelineEntry`` rows by a job on the ``fanout``
+queue after they are written. Tweets by accounts at or above it are pulled
+when the timeline is read and merged with the pushed entries.
+
+An account whose follower count drops below the threshold has its recent
+tweets pushed then, since it is no longer pulled; tweets older than the
+latest ``TIMELINE_BACKFILL_SIZE`` drop out of its followers' timelines.
+An account that rises above it keeps its pushed entries, which the merge
+deduplicates against the pulled tweets.
+"""
+import heapq
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from core import jobs
+from core.models import TimelineEntry, Tweet
+
+
+def high_follower_ids(user):
+    """Return a queryset of ids of followed accounts served by pull."""
+    return user.follows.filter(
+        follower_count__gte=settings.TIMELINE_FANOUT_THRESHOLD,
+    ).values('id')
+
+
+def _push(owner_ids, tweets):
+    """Insert timeline entries for every owner and tweet pair."""
+    entries = [
+        TimelineEntry(owner_id=owner_id, tweet_id=tweet.id)
+        for owner_id in owner_ids
+        for tweet in tweets
+    ]
+    TimelineEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.TIMELINE_FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def publish_tweet(tweet):
+    """Push a new tweet into its author's timeline and queue the fan-out."""
+    _push([tweet.user_id], [tweet])
+    jobs.enqueue(fan_out_tweet, queue='fanout', tweet_id=tweet.id)
+
+
+def fan_out_tweet(tweet_id):
+    """Push a tweet into its followers' timelines."""
+    author = Tweet.objects.filter(id=tweet_id).values_list(
+        'user_id', 'user__follower_count',
+    ).first()
+    if author is None:
+        return
+    author_id, follower_count = author
+    if follower_count >= settings.TIMELINE_FANOUT_THRESHOLD:
+        return
+    followers = get_user_model().follows.through.objects.filter(
+        to_user_id=author_id,
+    )
+    _push(
+        followers.values_list('from_user_id', flat=True),
+        [Tweet(id=tweet_id)],
+    )
+
+
+def backfill_timeline(user, followed_ids):
+    """Push recent tweets of newly followed accounts into a timeline."""
+    tweets = Tweet.objects.filter(
+        user_id__in=followed_ids,
+    ).only('id').order_by('-id')[:settings.TIMELINE_BACKFILL_SIZE]
+    _push([user.id], tweets)
+
+
+def refill_crossings(counts):
+    """Queue refills for accounts that fell below the fan-out threshold.
+
+    ``counts`` yields ``(user_id, old_count, new_count)`` follower counts.
+    """
+    threshold = settings.TIMELINE_FANOUT_THRESHOLD
+    for user_id, old_count, new_count in counts:
+        if new_count < threshold <= old_count:
+            jobs.enqueue(refill_timelines, queue='fanout', author_id=user_id)
+
+
+def refill_timelines(author_id):
+    """Push the recent tweets of an account into its followers' timelines.
+
+    Does nothing if the account is back at or above the threshold.
+    """
+    follower_count = get_user_model().objects.filter(
+        id=author_id,
+    ).values_list('follower_count', flat=True).first()
+    if (
+        follower_count is None
+        or follower_count >= settings.TIMELINE_FANOUT_THRESHOLD
+    ):
+        return
+    tweets = list(Tweet.objects.filter(
+        user_id=author_id,
+    ).only('id').order_by('-id')[:settings.TIMELINE_BACKFILL_SIZE])
+    followers = get_user_model().follows.through.objects.filter(
+        to_user_id=author_id,
+    )
+    _push(followers.values_list('from_user_id', flat=True), tweets)
+
+
+def prune_timeline(user, unfollowed_ids):
+    """Remove tweets of unfollowed accounts from a timeline."""
+    TimelineEntry.objects.filter(
+        owner=user,
+        tweet__user_id__in=unfollowed_ids,
+    ).delete()
+
+
+def home_timeline(user, limit, before=None, after=None):
+    """Return up to ``limit`` timeline tweets, newest first.
+
+    With ``after`` the tweets closest above that id are returned, otherwise
+    the tweets closest below ``before`` (or the newest ones). Costs a fixed
+    number of queries regardless of how many accounts the user follows:
+    one for pushed entries, one for pulled tweets and one for the tweets
+    themselves.
+    """
+    pushed = TimelineEntry.objects.filter(owner=user)
+    pulled = Tweet.objects.filter(user_id__in=high_follower_ids(user))
+    if after is not None:
+        pushed = pushed.filter(tweet_id__gt=after).order_by('tweet_id')
+        pulled = pulled.filter(id__gt=after).order_by('id')
+    else:
+        if before is not None:
+            pushed = pushed.filter(tweet_id__lt=before)
+            pulled = pulled.filter(id__lt=before)
+        pushed = pushed.order_by('-tweet_id')
+        pulled = pulled.order_by('-id')
+
+    tweet_ids = []
+    for tweet_id in heapq.merge(
+        pushed.values_list('tweet_id', flat=True)[:limit],
+        pulled.values_list('id', flat=True)[:limit],
+        reverse=after is None,
+    ):
+        if tweet_ids and tweet_ids[-1] == tweet_id:
+            continue
+        tweet_ids.append(tweet_id)
+        if len(tweet_ids) == limit:
+            break
+
+    return Tweet.objects.filter(id__in=tweet_ids).order_by('-id')
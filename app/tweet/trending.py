@@ -0,0 +1,106 @@
+"""
+Trending hashtags from bucketed counters.
+
+Every hashtag use adds to a HashtagCount row for the time bucket its tweet
+was created in. Trending windows sum the few buckets they cover, so reads
+never group raw tweets, and the result is cached briefly on top.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core import cache
+from core.models import HashtagCount
+
+
+def bucket_start(moment):
+    """Return the start of the counter bucket containing a datetime."""
+    timestamp = int(moment.timestamp())
+    return datetime.datetime.fromtimestamp(
+        timestamp - timestamp % settings.TRENDING_BUCKET_SECONDS,
+        tz=datetime.timezone.utc,
+    )
+
+
+def count_hashtags(names, created, delta):
+    """Add ``delta`` uses of each hashtag to the bucket of ``created``."""
+    names = sorted(names)
+    if not names:
+        return
+    bucket = bucket_start(created)
+    if delta < 0:
+        HashtagCount.objects.filter(name__in=names, bucket=bucket).update(
+            count=F('count') + delta,
+        )
+        return
+    table = connection.ops.quote_name(HashtagCount._meta.db_table)
+    # Sorted names make concurrent upserts lock rows in the same order.
+    sql = (
+        f'INSERT INTO {table} (name, bucket, count) '
+        'SELECT unnest(%s::varchar[]), %s, %s '
+        'ON CONFLICT (name, bucket) DO UPDATE '
+        f'SET count = {table}.count + EXCLUDED.count'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [names, bucket, delta])
+
+
+def add_hashtag_counts(counts):
+    """Add uses from a mapping of ``(name, bucket)`` to a positive count."""
+    keys = sorted(counts)
+    if not keys:
+        return
+    table = connection.ops.quote_name(HashtagCount._meta.db_table)
+    sql = (
+        f'INSERT INTO {table} (name, bucket, count) '
+        'SELECT * FROM unnest('
+        '  %s::varchar[], %s::timestamptz[], %s::integer[]) '
+        'ON CONFLICT (name, bucket) DO UPDATE '
+        f'SET count = {table}.count + EXCLUDED.count'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [
+            [name for name, _ in keys],
+            [bucket for _, bucket in keys],
+            [counts[key] for key in keys],
+        ])
+
+
+def top_hashtags(window):
+    """Return the most used hashtags over a window, most used first."""
+    def build():
+        since = bucket_start(
+            timezone.now() - datetime.timedelta(
+                seconds=settings.TRENDING_WINDOWS[window],
+            )
+        )
+        rows = HashtagCount.objects.filter(
+            bucket__gte=since,
+        ).values('name').annotate(
+            total=Sum('count'),
+        ).filter(total__gt=0).order_by('-total', 'name')
+        return [
+            {'hashtag': row['name'], 'count': row['total']}
+            for row in rows[:settings.TRENDING_MAX_RESULTS]
+        ]
+
+    return cache.read_through(
+        f'trending:{window}',
+        build,
+        settings.TRENDING_CACHE_TIMEOUT,
+    )
+
+
+def prune_counts(now=None):
+    """Delete buckets older than the longest window and return how many."""
+    now = now or timezone.now()
+    since = bucket_start(
+        now - datetime.timedelta(
+            seconds=max(settings.TRENDING_WINDOWS.values()),
+        )
+    )
+    deleted, _ = HashtagCount.objects.filter(bucket__lt=since).delete()
+    return deleted
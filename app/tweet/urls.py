@@ -3,7 +3,7 @@ URL mappings for the tweet app.
 """
 from django.urls import path,include
 from rest_framework.routers import DefaultRouter
-from tweet import views
+from tweet import async_views, views
 
 router = DefaultRouter()
 router.register('tweets', views.TweetViewSet)
@@ -11,6 +11,18 @@ router.register('tweets', views.TweetViewSet)
 app_name = 'tweet'
 
 urlpatterns = [
+    path('timeline/', views.TimelineView.as_view(), name='timeline'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('popular/', views.PopularTweetsView.as_view(), name='popular'),
+    path('trending/', views.TrendingView.as_view(), name='trending'),
+    path(
+        'hashtags/<str:name>/',
+        views.HashtagTweetsView.as_view(),
+        name='hashtag',
+    ),
+    path('async/timeline/', async_views.home_timeline, name='async-timeline'),
+    path('async/like/<int:tweet_id>', async_views.like, name='async-like'),
+    path('like/bulk/', views.BulkLikeView.as_view(), name='like-bulk'),
     path('like/<int:tweet_id>', views.LikeView.as_view(), name='like'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Version tokens for each author's tweets, used to answer conditional GETs.
+
+Like writes update ``like_count`` with a queryset update that leaves
+``Tweet.updated`` alone, so every write that changes a tweet payload bumps
+its author's token instead.
+"""
+from django.db import transaction
+
+from core import cache
+
+NAMESPACE = 'tweets'
+
+
+def tweets_version(request, *args, **kwargs):
+    """Return the version tokens behind the authenticated user's tweets."""
+    return [cache.get_version(NAMESPACE, request.user.pk)]
+
+
+def invalidate_tweets(author_ids):
+    """Move the given authors' tweets to a new version after commit."""
+    author_ids = list(author_ids)
+    if author_ids:
+        transaction.on_commit(
+            lambda: cache.bump_versions(NAMESPACE, author_ids),
+        )
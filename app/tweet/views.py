@@ -1,26 +1,68 @@
 """
 Views for the tweet APIs.
 """
-from rest_framework import viewsets, status
-from rest_framework.authentication import TokenAuthentication
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.authentication import CachedTokenAuthentication
+from core.conditional import conditional_on_versions
+from core.fields import selection_for
 from core.models import Tweet
-from tweet import serializers
+from core.pagination import KeysetPagination, RankedKeysetPagination
+from core.routers import ReplicaReadMixin
+from core.rows import RowListMixin
+from core.streaming import stream_list, wants_stream
+from tweet import (
+    likes, popular, search, serializers, timeline, trending, versions,
+)
+from user import profiles
 
 
-class TweetViewSet(viewsets.ModelViewSet):
+def with_selected_likes(queryset, request, selection):
+    """Annotate ``liked_by_me`` on tweets if the selection outputs it."""
+    if selection.includes('liked_by_me'):
+        return queryset.with_liked_by(request.user)
+    return queryset
+
+
+class TweetViewSet(RowListMixin, viewsets.ModelViewSet):
     """View for manage tweet APIs."""
     serializer_class = serializers.TweetDetailSerializer
+    row_serializer_class = serializers.TweetRowSerializer
     queryset = Tweet.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        """Retrieve tweets for authenticated user."""
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        """Retrieve tweets for authenticated user.
+
+        Relations left out by ``?fields=`` are not annotated, joined or
+        prefetched.
+        """
+        selection = self.get_field_selection()
+        queryset = with_selected_likes(
+            self.queryset.filter(user=self.request.user).order_by('-id'),
+            self.request,
+            selection,
+        )
+        if self.action != 'list':
+            if selection.includes('likes'):
+                queryset = queryset.prefetch_related(Prefetch(
+                    'likes',
+                    queryset=get_user_model().objects.only(
+                        'id', 'name', 'email',
+                    ),
+                ))
+            if selection.expands('user'):
+                queryset = queryset.select_related('user')
+
+        return queryset
 
     def get_serializer_class(self):
         """Return the serializer class for requests."""
@@ -29,26 +71,200 @@ class TweetViewSet(viewsets.ModelViewSet):
 
         return self.serializer_class
 
+    @conditional_on_versions(versions.tweets_version)
+    def list(self, request, *args, **kwargs):
+        """List tweets, or 304 if they did not change.
+
+        With ``?stream=true`` every tweet is streamed as one JSON array
+        instead of a page.
+        """
+        if wants_stream(request):
+            return stream_list(
+                self.get_row_queryset(), self.get_row_serializer(),
+            )
+        return super().list(request, *args, **kwargs)
+
+    @conditional_on_versions(versions.tweets_version)
+    def retrieve(self, request, *args, **kwargs):
+        """Return a tweet, or 304 if it did not change."""
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Create a new tweet."""
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            tweet = serializer.save(user=self.request.user)
+            timeline.publish_tweet(tweet)
+            versions.invalidate_tweets([tweet.user_id])
+
+    def perform_update(self, serializer):
+        """Update a tweet and its hashtags and mentions."""
+        with transaction.atomic():
+            tweet = serializer.save()
+            versions.invalidate_tweets([tweet.user_id])
+
+    def perform_destroy(self, instance):
+        """Delete a tweet and refresh the like counts of its likers."""
+        with transaction.atomic():
+            liker_ids = list(instance.likes.through.objects.filter(
+                tweet=instance,
+            ).values_list('user_id', flat=True))
+            instance.delete()
+            profiles.invalidate_profiles(liker_ids)
+            versions.invalidate_tweets([instance.user_id])
+
+
+def timeline_page(request):
+    """Return one page of the authenticated user's home timeline."""
+    paginator = KeysetPagination()
+    paginator.read_cursors(request)
+    selection = selection_for(request, serializers.TweetSerializer)
+    serializer = serializers.TweetRowSerializer(selection=selection)
+    tweets = with_selected_likes(timeline.home_timeline(
+        request.user,
+        limit=paginator.page_size + 1,
+        before=paginator.before,
+        after=paginator.after,
+    ), request, selection)
+    page = paginator.paginate_rows(list(serializer.values(tweets, 'id')))
+    return paginator.get_paginated_response(serializer.represent(page))
+
+
+class TimelineView(APIView):
+    """View for the authenticated user's home timeline."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get(self, request):
+        """List tweets from the user and the accounts they follow."""
+        return timeline_page(request)
+
+
+class SearchView(ReplicaReadMixin, RowListMixin, generics.ListAPIView):
+    """Full-text search over all tweets, best matches first."""
+    serializer_class = serializers.TweetSerializer
+    row_serializer_class = serializers.TweetRowSerializer
+    row_columns = ('id', 'rank')
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = RankedKeysetPagination
+
+    def get_queryset(self):
+        """Return tweets matching the ``q`` query parameter."""
+        params = serializers.TweetSearchSerializer(
+            data=self.request.query_params,
+        )
+        params.is_valid(raise_exception=True)
+        return with_selected_likes(
+            search.search_tweets(params.validated_data['q']),
+            self.request,
+            self.get_field_selection(),
+        )
+
+
+class HashtagTweetsView(ReplicaReadMixin, RowListMixin, generics.ListAPIView):
+    """List tweets using a hashtag, newest first."""
+    serializer_class = serializers.TweetSerializer
+    row_serializer_class = serializers.TweetRowSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Return tweets tagged with the hashtag in the URL."""
+        return with_selected_likes(
+            Tweet.objects.filter(
+                hashtags__name=self.kwargs['name'].casefold(),
+            ),
+            self.request,
+            self.get_field_selection(),
+        )
+
+
+class TrendingView(APIView):
+    """View for the most used hashtags over a recent window."""
+    serializer_class = serializers.TrendingQuerySerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """List trending hashtags with their use counts."""
+        params = self.serializer_class(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        window = params.validated_data['window']
+        limit = params.validated_data['limit']
+        results = trending.top_hashtags(window)[:limit]
+        return Response({'window': window, 'results': results})
+
+
+class PopularTweetsView(APIView):
+    """View for the globally popular tweets."""
+    serializer_class = serializers.TweetSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """List the top tweets by time-decayed likes."""
+        tweet_ids = popular.top_ids()
+        selection = selection_for(request, self.serializer_class)
+        serializer = serializers.TweetRowSerializer(selection=selection)
+        tweets = with_selected_likes(
+            Tweet.objects.filter(id__in=tweet_ids),
+            request,
+            selection,
+        )
+        position = {
+            tweet_id: index for index, tweet_id in enumerate(tweet_ids)
+        }
+        tweets = sorted(
+            serializer.values(tweets, 'id'),
+            key=lambda tweet: position[tweet['id']],
+        )
+        return Response({'results': serializer.represent(tweets)})
 
 
 class LikeView(APIView):
     """View for manage likes."""
     serializer_class = serializers.LikeSerializer
     queryset = Tweet.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, tweet_id):
         """Like tweet."""
-        tweet = Tweet.objects.get(id=tweet_id)
-        tweet.likes.add(request.user)
+        if not likes.add_likes(request.user, [tweet_id]):
+            get_object_or_404(Tweet.objects.only('id'), id=tweet_id)
         return Response({'message':'Tweet liked.'}, status=status.HTTP_200_OK)
 
     def delete(self, request, tweet_id):
         """Remove like from previously liked tweet."""
-        tweet = Tweet.objects.get(id=tweet_id)
-        tweet.likes.remove(request.user)
-        return Response({'message':'Like is removed.'}, status=status.HTTP_200_OK)
\ No newline at end of file
+        if not likes.remove_likes(request.user, [tweet_id]):
+            get_object_or_404(Tweet.objects.only('id'), id=tweet_id)
+        return Response(
+            {'message': 'Like is removed.'},
+            status=status.HTTP_200_OK,
+        )
+
+
+class BulkLikeView(APIView):
+    """View for liking and unliking many tweets at once."""
+    serializer_class = serializers.BulkLikeSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Like tweets."""
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tweet_ids = serializer.validated_data['ids']
+        liked = likes.add_likes(request.user, tweet_ids)
+        results = likes.like_results(tweet_ids, liked, 'liked')
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """Remove likes from tweets."""
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tweet_ids = serializer.validated_data['ids']
+        unliked = likes.remove_likes(request.user, tweet_ids)
+        results = likes.like_results(tweet_ids, unliked, 'unliked')
+        return Response({'results': results}, status=status.HTTP_200_OK)
@@ -0,0 +1,223 @@
+"""
+Follow writes for one or many accounts at once.
+
+Every write that inserts or deletes follow rows moves ``follower_count``
+and ``following_count`` of the accounts involved in the same transaction,
+so the counts only change when an edge really does.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from tweet import timeline
+from user import profiles
+
+
+def _tables():
+    """Return quoted names used by the follow statements."""
+    User = get_user_model()
+    Follow = User.follows.through
+    quote = connection.ops.quote_name
+    return {
+        'follows': quote(Follow._meta.db_table),
+        'users': quote(User._meta.db_table),
+        'from_id': quote(Follow._meta.get_field('from_user').column),
+        'to_id': quote(Follow._meta.get_field('to_user').column),
+    }
+
+
+def _move_counts(cursor, deltas):
+    """Add ``deltas``, a map of user id to (followers, following), to counts.
+
+    The rows are locked in id order first so concurrent follows between
+    the same accounts cannot deadlock.
+    """
+    ids = sorted(deltas)
+    tables = _tables()
+    cursor.execute(
+        'SELECT id FROM {users} WHERE id = ANY(%s) '
+        'ORDER BY id FOR NO KEY UPDATE'.format(**tables),
+        [ids],
+    )
+    cursor.execute(
+        'UPDATE {users} u SET '
+        'follower_count = u.follower_count + d.followers, '
+        'following_count = u.following_count + d.following '
+        'FROM unnest(%s::bigint[], %s::integer[], %s::integer[]) '
+        'AS d(id, followers, following) '
+        'WHERE u.id = d.id '
+        'RETURNING u.id, u.follower_count - d.followers, '
+        'u.follower_count'.format(**tables),
+        [ids, [deltas[i][0] for i in ids], [deltas[i][1] for i in ids]],
+    )
+    timeline.refill_crossings(cursor.fetchall())
+
+
+def _adjust_counts(cursor, user_id, changed_ids, sign):
+    """Move the follow counts of a user and the accounts it (un)followed."""
+    deltas = {user_id: [0, sign * len(changed_ids)]}
+    for changed_id in changed_ids:
+        deltas.setdefault(changed_id, [0, 0])[0] += sign
+    _move_counts(cursor, deltas)
+
+
+def add_follows(user, user_ids):
+    """Follow accounts and return the ids of the follows actually inserted.
+
+    One INSERT ... SELECT ... ON CONFLICT DO NOTHING skips missing accounts
+    and existing follows.
+    """
+    sql = (
+        'INSERT INTO {follows} ({from_id}, {to_id}) '
+        'SELECT %s, id FROM {users} WHERE id = ANY(%s) '
+        'ON CONFLICT DO NOTHING RETURNING {to_id}'
+    ).format(**_tables())
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.id, list(user_ids)])
+            followed = {row[0] for row in cursor.fetchall()}
+            if followed:
+                _adjust_counts(cursor, user.id, followed, 1)
+        if followed:
+            timeline.backfill_timeline(user, followed)
+            profiles.invalidate_profiles([user.id, *followed])
+
+    return followed
+
+
+def remove_follows(user, user_ids):
+    """Unfollow accounts and return the ids of the follows actually deleted."""
+    sql = (
+        'DELETE FROM {follows} WHERE {from_id} = %s AND {to_id} = ANY(%s) '
+        'RETURNING {to_id}'
+    ).format(**_tables())
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.id, list(user_ids)])
+            unfollowed = {row[0] for row in cursor.fetchall()}
+            if unfollowed:
+                _adjust_counts(cursor, user.id, unfollowed, -1)
+        if unfollowed:
+            timeline.prune_timeline(user, unfollowed)
+            profiles.invalidate_profiles([user.id, *unfollowed])
+
+    return unfollowed
+
+
+def detach_user(user_id):
+    """Delete the follows of a user about to be deleted.
+
+    The accounts on the other end of each follow lose a follower or a
+    followed account, which the cascade of the user's delete would not
+    count. Returns their ids.
+    """
+    tables = _tables()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM {follows} WHERE {from_id} = %s '
+                'RETURNING {to_id}'.format(**tables),
+                [user_id],
+            )
+            followed = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                'DELETE FROM {follows} WHERE {to_id} = %s '
+                'RETURNING {from_id}'.format(**tables),
+                [user_id],
+            )
+            followers = {row[0] for row in cursor.fetchall()}
+            deltas = {}
+            for followed_id in followed:
+                deltas.setdefault(followed_id, [0, 0])[0] -= 1
+            for follower_id in followers:
+                deltas.setdefault(follower_id, [0, 0])[1] -= 1
+            deltas.pop(user_id, None)
+            if deltas:
+                _move_counts(cursor, deltas)
+
+    return set(deltas)
+
+
+def _recount(where, params):
+    """Recount the users matching ``where`` and return the wrong ids.
+
+    The users are locked in id order first, as ``_move_counts`` does, and
+    counted by a separate statement. Its snapshot is taken after the
+    locks are granted, so it sees the follows of writers that held them,
+    and writers that come later move the counts after it.
+    """
+    tables = _tables()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, follower_count FROM {users} x WHERE {where} '
+                'ORDER BY id FOR NO KEY UPDATE'.format(where=where, **tables),
+                params,
+            )
+            old_counts = dict(cursor.fetchall())
+            cursor.execute(
+                'UPDATE {users} u SET follower_count = c.followers, '
+                'following_count = c.following '
+                'FROM (SELECT x.id, '
+                '  (SELECT COUNT(*) FROM {follows} WHERE {to_id} = x.id) '
+                '    AS followers, '
+                '  (SELECT COUNT(*) FROM {follows} WHERE {from_id} = x.id) '
+                '    AS following '
+                '  FROM unnest(%s::bigint[]) AS x(id)) c '
+                'WHERE u.id = c.id '
+                'AND (u.follower_count <> c.followers '
+                '  OR u.following_count <> c.following) '
+                'RETURNING u.id, u.follower_count'.format(**tables),
+                [sorted(old_counts)],
+            )
+            rows = cursor.fetchall()
+        timeline.refill_crossings(
+            (user_id, old_counts[user_id], count) for user_id, count in rows
+        )
+    return [user_id for user_id, _ in rows]
+
+
+def recount_users(user_ids):
+    """Recount the follow counts of users, returning the wrong ids."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return []
+    return _recount('x.id = ANY(%s)', [user_ids])
+
+
+def recount_range(low, high):
+    """Recount users with ids in (low, high], returning the wrong ids."""
+    return _recount('x.id > %s AND x.id <= %s', [low, high])
+
+
+def resolve_ids(user_ids):
+    """Return a mapping of the given ids to themselves for existing users."""
+    existing = get_user_model().objects.filter(
+        id__in=set(user_ids),
+    ).values_list('id', flat=True)
+    return {user_id: user_id for user_id in existing}
+
+
+def resolve_emails(emails):
+    """Return a mapping of the given emails to ids of existing users."""
+    return dict(get_user_model().objects.filter(
+        email__in=set(emails),
+    ).values_list('email', 'id'))
+
+
+def follow_results(targets, resolved, changed, status):
+    """Return a per-target result list for a batch of follow changes.
+
+    ``resolved`` maps each target that exists to its user id.
+    """
+    results = []
+    for target in dict.fromkeys(targets):
+        user_id = resolved.get(target)
+        if user_id is None:
+            result = 'not_found'
+        elif user_id in changed:
+            result = status
+        else:
+            result = 'unchanged'
+        results.append({'target': target, 'status': result})
+
+    return results
@@ -0,0 +1,120 @@
+"""
+Profile image renditions.
+
+Uploads are saved as sent, then a job on the ``images`` queue renders
+square renditions of every configured size and format and records their
+storage paths in ``User.image_renditions`` as ``{size: {format: path}}``.
+Formats the installed Pillow cannot encode, such as WebP without libwebp,
+are skipped.
+"""
+import io
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, features
+from rest_framework.exceptions import ValidationError
+
+from core import jobs
+from user import profiles
+
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+PIL_FEATURES = {'webp': 'webp', 'jpeg': 'jpg'}
+RENDITION_DIR = os.path.join('uploads', 'user', 'renditions')
+
+
+def available_formats():
+    """Return the configured rendition formats Pillow can encode."""
+    return tuple(
+        image_format for image_format in settings.PROFILE_IMAGE_FORMATS
+        if features.check(PIL_FEATURES[image_format])
+    )
+
+
+def requested_rendition(query_params):
+    """Return the (size, format) asked for by ``image_size``/``image_format``.
+
+    The size is rounded up to the nearest rendition so every request maps
+    to a stored file. Returns None when no size is asked for.
+    """
+    size = query_params.get('image_size')
+    if size is None:
+        return None
+    try:
+        size = int(size)
+    except ValueError:
+        raise ValidationError({'image_size': 'Must be an integer.'})
+    formats = available_formats()
+    image_format = query_params.get('image_format', formats[0])
+    if image_format not in formats:
+        raise ValidationError({'image_format': (
+            f'Must be one of {", ".join(formats)}.'
+        )})
+    sizes = sorted(settings.PROFILE_IMAGE_SIZES)
+    size = next((s for s in sizes if s >= size), sizes[-1])
+    return size, image_format
+
+
+def rendition_path(user, rendition):
+    """Return the storage path of a rendition, or None if not rendered."""
+    size, image_format = rendition
+    return user.image_renditions.get(str(size), {}).get(image_format)
+
+
+def delete_renditions(renditions):
+    """Delete rendition files from storage."""
+    for paths in renditions.values():
+        for path in paths.values():
+            default_storage.delete(path)
+
+
+def render_renditions(user_id, name):
+    """Render every rendition of an uploaded image and record them.
+
+    The renditions are only recorded if ``name`` is still the user's
+    image, so a slow job cannot overwrite the result of a newer upload.
+    EXIF and other metadata are dropped by re-encoding.
+    """
+    largest = max(settings.PROFILE_IMAGE_SIZES)
+    with default_storage.open(name) as f, Image.open(f) as original:
+        # Lets JPEG decode at a reduced scale that still covers every size.
+        original.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(original).convert('RGB')
+
+    stem = os.path.splitext(os.path.basename(name))[0]
+    formats = available_formats()
+    renditions = {}
+    for size in settings.PROFILE_IMAGE_SIZES:
+        resized = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        renditions[str(size)] = {}
+        for image_format in formats:
+            buffer = io.BytesIO()
+            resized.save(
+                buffer,
+                PIL_FORMATS[image_format],
+                quality=settings.PROFILE_IMAGE_QUALITY,
+            )
+            renditions[str(size)][image_format] = default_storage.save(
+                os.path.join(RENDITION_DIR, f'{stem}_{size}.{image_format}'),
+                ContentFile(buffer.getvalue()),
+            )
+
+    users = get_user_model().objects.filter(pk=user_id)
+    with transaction.atomic():
+        previous = users.select_for_update().values_list(
+            'image_renditions', flat=True,
+        ).first()
+        updated = users.filter(image=name).update(image_renditions=renditions)
+        if updated:
+            profiles.invalidate_profiles([user_id])
+    delete_renditions((previous or {}) if updated else renditions)
+
+    return renditions if updated else None
+
+
+def schedule_renditions(user_id, name):
+    """Queue rendering an upload's renditions."""
+    jobs.enqueue(render_renditions, queue='images', user_id=user_id, name=name)
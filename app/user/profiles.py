@@ -0,0 +1,40 @@
+"""
+Cached profile payloads for the /api/user/me/ endpoint.
+"""
+from django.db import transaction
+
+from core import cache
+
+NAMESPACE = 'profile'
+
+
+def profile_cache_key(user_id, rendition=None, fields=None):
+    """Return the cache key for a user's current profile payload.
+
+    Payloads that link an image rendition or hold a subset of the fields
+    are cached per rendition and field set.
+    """
+    key = cache.versioned_key(NAMESPACE, user_id)
+    if rendition is not None:
+        key = '{}:{}.{}'.format(key, *rendition)
+    if fields is not None:
+        key = '{}:{}'.format(key, ','.join(sorted(fields)))
+    return key
+
+
+def profile_version(request, *args, **kwargs):
+    """Return the version tokens behind the authenticated user's profile."""
+    return [cache.get_version(NAMESPACE, request.user.pk)]
+
+
+def invalidate_profiles(user_ids):
+    """Move the given users' profiles to a new cache version.
+
+    The bump waits for the surrounding transaction to commit so a
+    concurrent read cannot cache the old rows under the new version.
+    """
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(
+            lambda: cache.bump_versions(NAMESPACE, user_ids),
+        )
@@ -2,14 +2,45 @@
 Serializers for the user API View.
 """
 
-from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.core.files.storage import default_storage
 from django.utils.translation import gettext as _
+from core.fields import SparseFieldsMixin
+from core.metrics import TimedSerializerMixin
 from core.models import Tweet, User
+from core.rows import RowSerializer
 
 from rest_framework import serializers
 
+from user import images
 
-class FollowSerializer(serializers.ModelSerializer):
+
+class ProfileImageField(serializers.ImageField):
+    """Read-only profile image URL.
+
+    Returns the rendition in the serializer context's ``image_rendition``
+    if it has been rendered, and the original upload otherwise.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return instance
+
+    def to_representation(self, user):
+        rendition = self.context.get('image_rendition')
+        path = rendition and images.rendition_path(user, rendition)
+        if not path:
+            return super().to_representation(user.image)
+        url = default_storage.url(path)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class FollowSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for follows list."""
     id = serializers.IntegerField()
 
@@ -23,7 +54,29 @@ class FollowSerializer(serializers.ModelSerializer):
         read_only_fields = ['name', 'email']
 
 
-class UserImageSerializer(serializers.ModelSerializer):
+class UserRowSerializer(RowSerializer):
+    """Read-only ``FollowSerializer`` for ``values()`` rows."""
+    fields = FollowSerializer.Meta.fields
+
+
+class PublicUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for users listed to anyone, without their email."""
+
+    class Meta:
+        model = get_user_model()
+        fields = (
+            'id',
+            'name',
+        )
+        read_only_fields = fields
+
+
+class PublicUserRowSerializer(RowSerializer):
+    """Read-only ``PublicUserSerializer`` for ``values()`` rows."""
+    fields = PublicUserSerializer.Meta.fields
+
+
+class UserImageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for profile pictures."""
 
     class Meta:
@@ -32,6 +85,12 @@ class UserImageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
         extra_kwargs = {'image': {'required': 'True'}}
 
+    def update(self, instance, validated_data):
+        """Save only the image, leaving columns other writers move."""
+        instance.image = validated_data['image']
+        instance.save(update_fields=['image'])
+        return instance
+
 
 class LikedTweetSerializer(serializers.ModelSerializer):
     """Serializer for likes."""
@@ -46,51 +105,101 @@ class LikedTweetSerializer(serializers.ModelSerializer):
         read_only_fields = ['tweet_text']
 
 
-class UserSerializer( serializers.ModelSerializer):
-    """Serializer for the user object."""
-    followers = FollowSerializer(many=True, required=False)
-    follows = FollowSerializer(many=True, required=False)
-    likes = LikedTweetSerializer(many=True, required=False)
+class LikedTweetRowSerializer(RowSerializer):
+    """Read-only ``LikedTweetSerializer`` for ``values()`` rows."""
+    fields = LikedTweetSerializer.Meta.fields
+
+
+class UserSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer,
+):
+    """Serializer for the user object.
+
+    Relations are reported as counts; the lists themselves are served by
+    the paginated followers, following and likes endpoints.
+    """
+    image = ProfileImageField()
+    follows_count = serializers.IntegerField(read_only=True)
+    followers_count = serializers.IntegerField(read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = get_user_model()
-        fields = ['id', 'email', 'password', 'name', 'follows', 'followers', 'likes', 'image']
+        fields = [
+            'id',
+            'email',
+            'password',
+            'name',
+            'image',
+            'follows_count',
+            'followers_count',
+            'likes_count',
+        ]
+        read_only_fields = ['id']
         extra_kwargs = {'password': {'write_only': True, 'min_length': 5}}
 
     def create(self, validated_data):
         """Create an user."""
-        validated_data.pop('follows', [])
-        validated_data.pop('followers', [])
-        validated_data.pop('likes', [])
-        validated_data.pop('image', [])
         password = validated_data.pop('password')
         user = get_user_model().objects.create_user(password=password, **validated_data)
+        user.follows_count = user.followers_count = user.likes_count = 0
 
         return user
 
-
     def update(self, instance, validated_data):
-        """Update an user."""
-        user_follows = validated_data.pop('follows', [])
-        user_followers = validated_data.pop('followers', [])
-        likes = validated_data.pop('likes', [])
-        image = validated_data.pop('image', [])
-
-        for list, list_field in [
-            (user_follows, instance.follows),
-            (user_followers, instance.followers),
-            (likes, instance.likes),
-            (image, instance.image)
-            ]:
-
-            if list is not None:
-                for item in list:
-                    for attr, value in item:
-                        setattr(list_field, attr, value)
+        """Update an user.
 
+        Only the updated fields are saved, so the follow counts moved by
+        concurrent follows are not written back.
+        """
+        password = validated_data.pop('password', None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
+        update_fields = list(validated_data)
+        if password:
+            instance.set_password(password)
+            update_fields.append('password')
 
-        instance.save()
+        instance.save(update_fields=update_fields)
         return instance
 
+
+class AuthTokenSerializer(serializers.Serializer):
+    """Serializer for the user auth token."""
+    email = serializers.EmailField()
+    password = serializers.CharField(
+        style={'input_type': 'password'},
+        trim_whitespace=False,
+    )
+
+    def validate(self, attrs):
+        """Validate and authenticate the user."""
+        user = authenticate(
+            request=self.context.get('request'),
+            username=attrs.get('email'),
+            password=attrs.get('password'),
+        )
+        if not user:
+            msg = _('Unable to authenticate with provided credentials.')
+            raise serializers.ValidationError(msg, code='authorization')
+
+        attrs['user'] = user
+        return attrs
+
+
+class BulkFollowSerializer(serializers.Serializer):
+    """Serializer for following or unfollowing many users."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_FOLLOW_MAX_TARGETS,
+    )
+
+
+class FollowImportSerializer(serializers.Serializer):
+    """Serializer for importing a follow list of emails."""
+    emails = serializers.ListField(
+        child=serializers.EmailField(),
+        allow_empty=False,
+        max_length=settings.BULK_FOLLOW_MAX_TARGETS,
+    )
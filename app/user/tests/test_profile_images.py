@@ -0,0 +1,170 @@
+"""
+Tests for profile image uploads and renditions.
+"""
+import io
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import jobs
+from user import follows, images
+
+UPLOAD_URL = reverse('user:upload_image')
+ME_URL = reverse('user:me')
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(size=(640, 480)):
+    """Return an in-memory JPEG carrying EXIF metadata."""
+    exif = Image.Exif()
+    exif[0x010F] = 'Test Camera'
+    f = io.BytesIO()
+    Image.new('RGB', size, 'red').save(f, 'JPEG', exif=exif)
+    f.name = 'avatar.jpg'
+    f.seek(0)
+    return f
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ProfileImageTests(TestCase):
+    """Test uploading profile images."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                UPLOAD_URL,
+                {'image': image_file()},
+                format='multipart',
+            )
+            jobs.run_pending(['images'])
+        self.user.refresh_from_db()
+        return res
+
+    def test_upload_renders_renditions(self):
+        """Test every size and format is rendered without metadata."""
+        res = self.upload()
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(default_storage.exists(self.user.image.name))
+        for size in (48, 96, 400):
+            for image_format in images.available_formats():
+                path = self.user.image_renditions[str(size)][image_format]
+                with default_storage.open(path) as f:
+                    with Image.open(f) as rendition:
+                        self.assertEqual(rendition.size, (size, size))
+                        self.assertEqual(
+                            rendition.format.lower(), image_format,
+                        )
+                    self.assertEqual(len(rendition.getexif()), 0)
+
+    def test_new_upload_replaces_renditions(self):
+        """Test renditions of a replaced image are deleted."""
+        self.upload()
+        old_path = self.user.image_renditions['48']['jpeg']
+
+        self.upload()
+
+        self.assertNotEqual(self.user.image_renditions['48']['jpeg'], old_path)
+        self.assertFalse(default_storage.exists(old_path))
+
+    def test_stale_render_is_discarded(self):
+        """Test rendering an image that was replaced records nothing."""
+        self.upload()
+        current = self.user.image_renditions
+        replaced = default_storage.save(
+            'uploads/user/replaced.jpg',
+            image_file(),
+        )
+
+        result = images.render_renditions(self.user.pk, replaced)
+
+        self.user.refresh_from_db()
+        self.assertIsNone(result)
+        self.assertEqual(self.user.image_renditions, current)
+
+    def test_unsupported_format_skipped(self):
+        """Test formats Pillow cannot encode are not rendered or offered."""
+        with patch(
+            'user.images.features.check',
+            lambda feature: feature != 'webp',
+        ):
+            self.upload()
+            res = self.client.get(
+                ME_URL,
+                {'image_size': 48, 'image_format': 'webp'},
+            )
+
+        self.assertEqual(set(self.user.image_renditions['48']), {'jpeg'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_invalid_image(self):
+        """Test uploading a file that is not an image fails."""
+        res = self.client.post(
+            UPLOAD_URL,
+            {'image': 'notanimage'},
+            format='multipart',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_profile_returns_requested_size(self):
+        """Test the profile links the closest rendition above the size."""
+        self.upload()
+
+        res = self.client.get(
+            ME_URL,
+            {'image_size': 90, 'image_format': 'jpeg'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rendition = self.user.image_renditions['96']['jpeg']
+        self.assertTrue(res.data['image'].endswith(rendition))
+
+    def test_profile_returns_original_by_default(self):
+        """Test the original image is returned without a size."""
+        self.upload()
+
+        res = self.client.get(ME_URL)
+
+        self.assertTrue(res.data['image'].endswith(self.user.image.name))
+
+    def test_profile_invalid_size(self):
+        """Test a non-numeric image size is rejected."""
+        res = self.client.get(ME_URL, {'image_size': 'large'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_keeps_follow_counts(self):
+        """Test uploading through a stale request user keeps its counts."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        follows.add_follows(other, [self.user.id])
+
+        self.upload()
+
+        self.assertEqual(self.user.follower_count, 1)
@@ -1,19 +1,48 @@
 """
 Tests for the user API.
 """
+import json
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core.models import Tweet
+
 
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
 
 
+def followers_url(user_id):
+    """Create and return a user's followers URL."""
+    return reverse('user:followers', args=[user_id])
+
+
+def following_url(user_id):
+    """Create and return a user's following URL."""
+    return reverse('user:following', args=[user_id])
+
+
+def likes_url(user_id):
+    """Create and return a user's liked tweets URL."""
+    return reverse('user:likes', args=[user_id])
+
+
+FOLLOWINGS_URL = reverse('user:followings')
+FOLLOW_URL = reverse('user:follow')
+FOLLOW_BULK_URL = reverse('user:follow-bulk')
+UNFOLLOW_BULK_URL = reverse('user:unfollow-bulk')
+FOLLOW_IMPORT_URL = reverse('user:follow-import')
+
+
 def create_user(**params):
     """Create and return a new user."""
     return get_user_model().objects.create_user(**params)
@@ -30,7 +59,7 @@ class PublicUserApiTests(TestCase):
         payload = {
             'email': 'test@example.com',
             'password': 'password123',
-            'username': 'Test Name',
+            'name': 'Test Name',
         }
 
         res = self.client.post(CREATE_USER_URL, payload)
@@ -45,7 +74,7 @@ class PublicUserApiTests(TestCase):
         payload = {
             'email': 'text@example.com',
             'password': 'password123',
-            'username': 'Test Name',
+            'name': 'Test Name',
         }
         create_user(**payload)
         res = self.client.post(CREATE_USER_URL, payload)
@@ -57,7 +86,7 @@ class PublicUserApiTests(TestCase):
         payload = {
             'email': 'test@example.com',
             'password': 'pw',
-            'username': 'Test name',
+            'name': 'Test name',
         }
 
         res = self.client.post(CREATE_USER_URL, payload)
@@ -71,7 +100,7 @@ class PublicUserApiTests(TestCase):
     def test_create_token_for_user(self):
         """Test generates token for valid credentials."""
         user_details = {
-            "username": "Test Name",
+            "name": "Test Name",
             "email": "test@example.com",
             "password": "test-user-password123",
         }
@@ -87,9 +116,17 @@ class PublicUserApiTests(TestCase):
 
     def test_create_token_bad_credentials(self):
         """Test returns error if credentials are invalid."""
-        create_user(email="test@example.com", password="goodpass", username="test user")
+        create_user(
+            email="test@example.com",
+            password="goodpass",
+            name="test user",
+        )
 
-        payload = {"email": "test@example.com", "password": "badpass", "username": "test user"}
+        payload = {
+            "email": "test@example.com",
+            "password": "badpass",
+            "name": "test user",
+        }
         res = self.client.post(TOKEN_URL, payload)
 
         self.assertNotIn("token", res.data)
@@ -97,7 +134,11 @@ class PublicUserApiTests(TestCase):
 
     def test_create_token_blank_password(self):
         """Test posting a blank password returns an error."""
-        payload = {"email": "test@example.com", "password": "", "username": "test user"}
+        payload = {
+            "email": "test@example.com",
+            "password": "",
+            "name": "test user",
+        }
         res = self.client.post(TOKEN_URL, payload)
 
         self.assertNotIn("token", res.data)
@@ -114,10 +155,11 @@ class PrivateUserApiTests(TestCase):
     """Test API requests that require authentication."""
 
     def setUp(self):
+        cache.clear()
         self.user = create_user(
             email='test@example.com',
             password='testpass123',
-            username='Test Name',
+            name='Test Name',
         )
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
@@ -127,10 +169,8 @@ class PrivateUserApiTests(TestCase):
         res = self.client.get(ME_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, {
-            'username': self.user.username,
-            'email': self.user.email,
-        })
+        self.assertEqual(res.data['name'], self.user.name)
+        self.assertEqual(res.data['email'], self.user.email)
 
     def test_post_me_not_allowed(self):
         """Test POST is not allowed for the me endpoint."""
@@ -140,11 +180,301 @@ class PrivateUserApiTests(TestCase):
 
     def test_update_user_profile(self):
         """Test updating the user profile for the authenticated user."""
-        payload = {'username': 'Updated Name', 'password': 'newpassword123'}
+        payload = {'name': 'Updated Name', 'password': 'newpassword123'}
 
         res = self.client.patch(ME_URL, payload)
 
         self.user.refresh_from_db()
-        self.assertEqual(self.user.username, payload['username'])
+        self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
-        self.assertEqual(res.status_code, status.HTTP_200_OK)
\ No newline at end of file
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_update_saves_only_changed_fields(self):
+        """Test a profile update does not write the follow counts."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(ME_URL, {'name': 'Updated Name'})
+
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('follower_count', updates[0])
+
+    def test_retrieve_profile_query_count(self):
+        """Test the profile reports relation counts in one query."""
+        for i in range(5):
+            other = create_user(
+                email=f'user{i}@example.com',
+                password='testpass123',
+            )
+            self.user.follows.add(other)
+            other.follows.add(self.user)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['follows_count'], 5)
+        self.assertEqual(res.data['followers_count'], 5)
+        self.assertEqual(res.data['likes_count'], 0)
+
+    def test_retrieve_profile_cached(self):
+        """Test a repeated profile read is served from cache."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_profile_sparse_fields(self):
+        """Test a profile without counts is read without counting."""
+        with self.assertNumQueries(1) as queries:
+            res = self.client.get(ME_URL, {'fields': 'id,name'})
+
+        self.assertEqual(
+            res.data,
+            {'id': self.user.id, 'name': self.user.name},
+        )
+        self.assertNotIn('COUNT(', queries.captured_queries[0]['sql'].upper())
+
+        res = self.client.get(ME_URL)
+
+        self.assertIn('followers_count', res.data)
+
+    def test_follow_invalidates_cached_profiles(self):
+        """Test following refreshes both users' cached profiles."""
+        other = create_user(email='other@example.com', password='testpass123')
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(FOLLOW_URL, {'id': other.id})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['follows_count'], 1)
+
+    def test_retrieve_profile_not_modified(self):
+        """Test an unchanged profile returns 304 until a follow."""
+        other = create_user(email='other@example.com', password='testpass123')
+        etag = self.client.get(ME_URL)['ETag']
+
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(FOLLOW_URL, {'id': other.id})
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['follows_count'], 1)
+
+    def test_followings_paginated(self):
+        """Test the followings list is split into cursor linked pages."""
+        followed = [
+            create_user(email=f'user{i}@example.com', password='testpass123')
+            for i in range(3)
+        ]
+        self.user.follows.add(*followed)
+
+        res = self.client.get(FOLLOWINGS_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [u['id'] for u in res.data['results']],
+            [followed[2].id, followed[1].id],
+        )
+
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            [u['id'] for u in res.data['results']],
+            [followed[0].id],
+        )
+
+    def test_followings_streamed(self):
+        """Test the whole followings list is streamed as one JSON array."""
+        followed = [
+            create_user(email=f'user{i}@example.com', password='testpass123')
+            for i in range(3)
+        ]
+        self.user.follows.add(*followed)
+
+        res = self.client.get(FOLLOWINGS_URL, {'stream': 'true'})
+
+        self.assertEqual(
+            [u['id'] for u in json.loads(b''.join(res.streaming_content))],
+            [u.id for u in reversed(followed)],
+        )
+
+    def test_followers_sparse_fields(self):
+        """Test relation lists output only the requested fields."""
+        other = create_user(email='other@example.com', password='testpass123')
+        self.user.follows.add(other)
+
+        res = self.client.get(following_url(self.user.id), {'fields': 'name'})
+
+        self.assertEqual(res.data['results'], [{'name': other.name}])
+
+    def test_follow_counts_change_only_with_edges(self):
+        """Test follow counts move once per follow added or removed."""
+        other = create_user(email='other@example.com', password='testpass123')
+
+        self.client.post(FOLLOW_URL, {'id': other.id})
+        self.client.post(FOLLOW_URL, {'id': other.id})
+
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.user.following_count, 1)
+        self.assertEqual(other.follower_count, 1)
+
+        self.client.post(
+            UNFOLLOW_BULK_URL,
+            {'ids': [other.id, other.id]},
+            format='json',
+        )
+        self.client.post(UNFOLLOW_BULK_URL, {'ids': [other.id]}, format='json')
+
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.user.following_count, 0)
+        self.assertEqual(other.follower_count, 0)
+
+    def test_orm_follow_edits_recount(self):
+        """Test follows edited through the ORM keep the counts."""
+        first = create_user(email='first@example.com', password='testpass123')
+        second = create_user(
+            email='second@example.com',
+            password='testpass123',
+        )
+
+        self.user.follows.set([first, second])
+        first.followers.remove(self.user)
+
+        self.user.refresh_from_db()
+        first.refresh_from_db()
+        self.assertEqual(self.user.following_count, 1)
+        self.assertEqual(first.follower_count, 0)
+
+        self.user.follows.clear()
+
+        self.user.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(self.user.following_count, 0)
+        self.assertEqual(second.follower_count, 0)
+
+    def test_deleted_user_leaves_follow_counts(self):
+        """Test deleting a user moves the counts of the linked accounts."""
+        other = create_user(email='other@example.com', password='testpass123')
+        self.user.follows.add(other)
+        other.follows.add(self.user)
+
+        other.delete()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.following_count, 0)
+        self.assertEqual(self.user.follower_count, 0)
+
+    def test_follow_missing_user_returns_404(self):
+        """Test following a user that does not exist returns not found."""
+        res = self.client.post(FOLLOW_URL, {'id': 999999})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_follow(self):
+        """Test following many users reports a result per id."""
+        first = create_user(email='first@example.com', password='testpass123')
+        second = create_user(
+            email='second@example.com',
+            password='testpass123',
+        )
+        self.user.follows.add(second)
+
+        payload = {'ids': [first.id, second.id, 999999]}
+        res = self.client.post(FOLLOW_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'target': first.id, 'status': 'followed'},
+            {'target': second.id, 'status': 'unchanged'},
+            {'target': 999999, 'status': 'not_found'},
+        ])
+        self.assertEqual(set(self.user.follows.all()), {first, second})
+
+    def test_bulk_unfollow(self):
+        """Test unfollowing many users reports a result per id."""
+        first = create_user(email='first@example.com', password='testpass123')
+        second = create_user(
+            email='second@example.com',
+            password='testpass123',
+        )
+        self.user.follows.add(first)
+
+        payload = {'ids': [first.id, second.id]}
+        res = self.client.post(UNFOLLOW_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.data['results'], [
+            {'target': first.id, 'status': 'unfollowed'},
+            {'target': second.id, 'status': 'unchanged'},
+        ])
+        self.assertFalse(self.user.follows.exists())
+
+    def test_import_follows(self):
+        """Test importing a list of emails follows the known accounts."""
+        known = create_user(email='known@example.com', password='testpass123')
+
+        payload = {'emails': ['known@example.com', 'unknown@example.com']}
+        res = self.client.post(FOLLOW_IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.data['results'], [
+            {'target': 'known@example.com', 'status': 'followed'},
+            {'target': 'unknown@example.com', 'status': 'not_found'},
+        ])
+        self.assertTrue(self.user.follows.filter(id=known.id).exists())
+
+    def test_list_followers_and_following(self):
+        """Test the followers and following lists of another user."""
+        other = create_user(email='other@example.com', password='testpass123')
+        third = create_user(email='third@example.com', password='testpass123')
+        self.user.follows.add(other)
+        other.follows.add(third)
+
+        res = self.client.get(followers_url(other.id))
+        self.assertEqual(
+            [u['id'] for u in res.data['results']],
+            [self.user.id],
+        )
+
+        res = self.client.get(following_url(other.id))
+        self.assertEqual([u['id'] for u in res.data['results']], [third.id])
+
+    def test_relation_lists_hide_email(self):
+        """Test the followers and following lists do not expose emails."""
+        other = create_user(email='other@example.com', password='testpass123')
+        other.follows.add(self.user)
+
+        res = self.client.get(followers_url(self.user.id))
+        self.assertEqual(
+            res.data['results'],
+            [{'id': other.id, 'name': other.name}],
+        )
+
+        res = self.client.get(following_url(other.id), {'fields': 'email'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_liked_tweets(self):
+        """Test the liked tweets list of a user."""
+        tweet = Tweet.objects.create(user=self.user, tweet_text='liked tweet')
+        Tweet.objects.create(user=self.user, tweet_text='other tweet')
+        tweet.likes.add(self.user)
+
+        res = self.client.get(likes_url(self.user.id))
+
+        self.assertEqual(res.data['results'], [
+            {'id': tweet.id, 'tweet_text': 'liked tweet'},
+        ])
+
+    def test_relation_list_missing_user(self):
+        """Test relation lists of a missing user return not found."""
+        res = self.client.get(followers_url(999999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
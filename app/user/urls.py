@@ -12,5 +12,31 @@ urlpatterns = [
     path('followings/', views.FollowViewSet.as_view({'get':'list'}), name='followings'),
     path('follow/', views.FollowViewSet.as_view({'post':'follow'}), name='follow'),
     path('unfollow/', views.FollowViewSet.as_view({'post':'unfollow'}), name='unfollow'),
+    path(
+        'follow/bulk/',
+        views.FollowViewSet.as_view({'post': 'bulk_follow'}),
+        name='follow-bulk',
+    ),
+    path(
+        'unfollow/bulk/',
+        views.FollowViewSet.as_view({'post': 'bulk_unfollow'}),
+        name='unfollow-bulk',
+    ),
+    path(
+        'follow/import/',
+        views.FollowViewSet.as_view({'post': 'import_follows'}),
+        name='follow-import',
+    ),
+    path(
+        '<int:pk>/followers/',
+        views.FollowersListView.as_view(),
+        name='followers',
+    ),
+    path(
+        '<int:pk>/following/',
+        views.FollowingListView.as_view(),
+        name='following',
+    ),
+    path('<int:pk>/likes/', views.LikedTweetsListView.as_view(), name='likes'),
     path('upload_image/', views.UploadProfilePictureView.as_view(), name='upload_image'),
 ]
\ No newline at end of file
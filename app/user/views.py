@@ -2,15 +2,39 @@
 Views for the user API.
 """
 
-from rest_framework import generics, authentication, permissions, viewsets, status
+from rest_framework import generics, permissions, viewsets, status
 from rest_framework.settings import api_settings
-from user.serializers import UserSerializer,  FollowSerializer, UserImageSerializer#, AuthTokenSerializer
+from user.serializers import (
+    AuthTokenSerializer,
+    UserSerializer,
+    FollowSerializer,
+    LikedTweetSerializer,
+    LikedTweetRowSerializer,
+    PublicUserSerializer,
+    PublicUserRowSerializer,
+    UserRowSerializer,
+    UserImageSerializer,
+    BulkFollowSerializer,
+    FollowImportSerializer,
+)
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
 
+from core import cache
+from core.authentication import CachedTokenAuthentication
+from core.conditional import conditional_on_versions
+from core.fields import FieldSelectionMixin
+from core.models import Tweet
+from core.routers import ReplicaReadMixin
+from core.rows import RowListMixin
+from core.streaming import stream_list, wants_stream
+from user import follows, images, profiles
+
 
 class CreateUserView(generics.CreateAPIView):
     """Create a new user in the system."""
@@ -19,6 +43,7 @@ class CreateUserView(generics.CreateAPIView):
 
 class AuthTokenView(ObtainAuthToken):
     """Create a new auth token for user."""
+    serializer_class = AuthTokenSerializer
 
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data,
@@ -33,60 +58,196 @@ class AuthTokenView(ObtainAuthToken):
         })
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(FieldSelectionMixin, generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     queryset = get_user_model().objects.all()
 
     def get_object(self):
-        """Retrieve and return the authenticated user."""
-        return self.request.user
-
-
-class FollowViewSet(viewsets.ModelViewSet):
+        """Retrieve and return the authenticated user.
+
+        Counts left out by ``?fields=`` are not computed.
+        """
+        selection = self.get_field_selection()
+        counts = [
+            name
+            for name in ('follows_count', 'followers_count', 'likes_count')
+            if selection.includes(name)
+        ]
+        users = get_user_model().objects.all()
+        if counts:
+            users = users.with_counts(*counts)
+        return users.get(pk=self.request.user.pk)
+
+    def get_serializer_context(self):
+        """Pass the image rendition asked for in the query string."""
+        context = super().get_serializer_context()
+        context['image_rendition'] = images.requested_rendition(
+            self.request.query_params,
+        )
+        return context
+
+    @conditional_on_versions(profiles.profile_version)
+    def retrieve(self, request, *args, **kwargs):
+        """Return the profile from cache, serializing it on a miss."""
+        data = cache.read_through(
+            profiles.profile_cache_key(
+                request.user.pk,
+                images.requested_rendition(request.query_params),
+                self.get_field_selection().fields,
+            ),
+            lambda: self.get_serializer(self.get_object()).data,
+            settings.PROFILE_CACHE_TIMEOUT,
+        )
+        return Response(data)
+
+    def perform_update(self, serializer):
+        """Update the profile and invalidate its cached payload."""
+        serializer.save()
+        profiles.invalidate_profiles([serializer.instance.pk])
+
+
+class FollowViewSet(ReplicaReadMixin, RowListMixin, viewsets.ModelViewSet):
     """Manage following users."""
     serializer_class = FollowSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    row_serializer_class = UserRowSerializer
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        """Retrieve the users the authenticated user follows."""
+        return self.request.user.follows.all()
+
     def list(self, request):
-        """List follows."""
-        follows = request.user.follows.all().order_by('-id')
-        serializer = FollowSerializer(follows, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """List follows, or stream all of them with ``?stream=true``."""
+        if wants_stream(request):
+            return stream_list(
+                self.get_row_queryset().order_by('-id'),
+                self.get_row_serializer(),
+            )
+        return super().list(request)
 
     def follow(self, request):
         """Follow user."""
-        follow_id = request.data.get('id')
-        user_to_be_followed = get_user_model().objects.get(id=follow_id)
-        request.user.follows.add(user_to_be_followed)
+        serializer = FollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        follow_id = serializer.validated_data['id']
+        if not follows.add_follows(request.user, [follow_id]):
+            get_object_or_404(
+                get_user_model().objects.only('id'), id=follow_id,
+            )
         return Response({"message": "Followed."}, status=status.HTTP_200_OK)
 
     def unfollow(self, request):
         """Unfollow user."""
-        unfollow_id = request.data.get('id')
-        user_to_be_unfollowed = get_user_model().objects.get(id=unfollow_id)
-        request.user.follows.remove(user_to_be_unfollowed)
+        serializer = FollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        unfollow_id = serializer.validated_data['id']
+        if not follows.remove_follows(request.user, [unfollow_id]):
+            get_object_or_404(
+                get_user_model().objects.only('id'), id=unfollow_id,
+            )
         return Response({"message": "Unfollowed."},status=status.HTTP_200_OK)
 
+    def bulk_follow(self, request):
+        """Follow many users by id."""
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_ids = serializer.validated_data['ids']
+        followed = follows.add_follows(request.user, user_ids)
+        resolved = follows.resolve_ids(set(user_ids) - followed)
+        resolved.update((user_id, user_id) for user_id in followed)
+        results = follows.follow_results(
+            user_ids, resolved, followed, 'followed',
+        )
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    def bulk_unfollow(self, request):
+        """Unfollow many users by id."""
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_ids = serializer.validated_data['ids']
+        unfollowed = follows.remove_follows(request.user, user_ids)
+        resolved = follows.resolve_ids(set(user_ids) - unfollowed)
+        resolved.update((user_id, user_id) for user_id in unfollowed)
+        results = follows.follow_results(
+            user_ids, resolved, unfollowed, 'unfollowed',
+        )
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    def import_follows(self, request):
+        """Follow the users in an imported list of emails."""
+        serializer = FollowImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        emails = serializer.validated_data['emails']
+        resolved = follows.resolve_emails(emails)
+        followed = follows.add_follows(request.user, resolved.values())
+        results = follows.follow_results(
+            emails, resolved, followed, 'followed',
+        )
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
 
 class UploadProfilePictureView(APIView):
     """Manage profile picture."""
     serializer_class = UserImageSerializer
     queryset = get_user_model().objects.all()
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk=None):
-        """Upload a profile image."""
-        user = self.request.user
+        """Store a profile image and queue rendering its renditions."""
+        # request.user may be a cached copy, so update a fresh one.
+        user = get_user_model().objects.get(pk=request.user.pk)
         serializer = UserImageSerializer(user, data=request.data)
 
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            profiles.invalidate_profiles([user.pk])
+            images.schedule_renditions(user.pk, serializer.instance.image.name)
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+class UserRelationListView(ReplicaReadMixin, RowListMixin,
+                           generics.ListAPIView):
+    """Base view for paginated lists related to a user.
+
+    Lists the rows of ``queryset`` whose ``relation`` is the user in the URL.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    relation = None
+
+    def get_queryset(self):
+        """Retrieve the related objects of the user in the URL."""
+        user_id = self.kwargs['pk']
+        get_object_or_404(get_user_model().objects.only('id'), pk=user_id)
+        return super().get_queryset().filter(**{self.relation: user_id})
+
+
+class FollowersListView(UserRelationListView):
+    """List the followers of a user."""
+    queryset = get_user_model().objects.all()
+    relation = 'follows'
+    serializer_class = PublicUserSerializer
+    row_serializer_class = PublicUserRowSerializer
+
+
+class FollowingListView(UserRelationListView):
+    """List the users a user follows."""
+    queryset = get_user_model().objects.all()
+    relation = 'followers'
+    serializer_class = PublicUserSerializer
+    row_serializer_class = PublicUserRowSerializer
+
+
+class LikedTweetsListView(UserRelationListView):
+    """List the tweets a user liked."""
+    queryset = Tweet.objects.all()
+    relation = 'likes'
+    serializer_class = LikedTweetSerializer
+    row_serializer_class = LikedTweetRowSerializer